@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+#
+#  backends.py
+"""
+Compare the throughput of the markdown parser backends.
+
+With py2latex installed (e.g. ``pip install -e .[markdown-it]``), run from the root of the repository::
+
+	python benchmarks/backends.py [--repeat N] [--copies N]
+
+The demo markdown files are concatenated ``--copies`` times to form the document,
+which is converted ``--repeat`` times with each backend.
+"""
+
+# stdlib
+import argparse
+import pathlib
+import time
+
+# this package
+from py2latex.markdown_parser import parse_markdown
+
+demo_dir = pathlib.Path(__file__).parent.parent / "demo"
+
+
+def main() -> None:  # noqa: D103
+	parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+	parser.add_argument("--repeat", type=int, default=5, help="The number of times to convert the document.")
+	parser.add_argument("--copies", type=int, default=20, help="The number of copies of the demo files.")
+	args = parser.parse_args()
+
+	document = "\n\n".join(path.read_text() for path in sorted(demo_dir.glob("*.md"))) * args.copies
+	size = len(document.encode("UTF-8"))
+	print(f"Document size: {size / 1024:.0f} KiB")
+
+	for backend in ("markdown", "markdown-it"):
+		# Warm up, which also imports the backend.
+		parse_markdown(document[:1000], backend=backend)
+
+		start = time.perf_counter()
+		for _ in range(args.repeat):
+			parse_markdown(document, backend=backend)
+		duration = (time.perf_counter() - start) / args.repeat
+
+		print(f"{backend:>12}: {duration:.3f}s per conversion, {size / duration / 1024 / 1024:.2f} MiB/s")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+#
+#  tolatex.py
+"""
+Check that converting the markdown tree to LaTeX scales linearly with the size of the document.
+
+With py2latex installed (e.g. ``pip install -e .``), run from the root of the repository::
+
+	python benchmarks/tolatex.py [--max-size MB]
+
+Element trees equivalent to markdown documents of increasing size, up to ``--max-size`` megabytes,
+are converted with :meth:`LaTeXTreeProcessor.tolatex <py2latex.markdown_parser.LaTeXTreeProcessor.tolatex>`.
+Parsing the markdown is excluded, so only the tree walk is timed.
+With linear scaling the time per megabyte stays roughly constant.
+A deeply nested list is also converted, to check the walk does not exceed the recursion limit.
+"""
+
+# stdlib
+import argparse
+import sys
+import time
+from xml.etree.ElementTree import Element, SubElement
+
+# this package
+from py2latex.markdown_parser import LaTeXTreeProcessor
+
+
+def make_tree(size: int) -> Element:
+	"""
+	Returns a tree with paragraphs, emphasis and lists whose text totals approximately ``size`` characters.
+
+	:param size:
+	"""
+
+	root = Element("div")
+	text = "Some text with a_b, 50% & 'quoted' words and gls{key}. "
+	written = 0
+
+	while written < size:
+		heading = SubElement(root, "h2")
+		heading.text = "A section heading"
+
+		paragraph = SubElement(root, 'p')
+		paragraph.text = text * 10
+		strong = SubElement(paragraph, "strong")
+		strong.text = "emphasised"
+		strong.tail = text * 5
+
+		items = SubElement(root, "ul")
+		for _ in range(5):
+			item = SubElement(items, "li")
+			item.text = text
+
+		written += len(text) * 20 + len("A section heading") + len("emphasised")
+
+	return root
+
+
+def make_nested_list(depth: int) -> Element:
+	"""
+	Returns a tree consisting of a list nested ``depth`` levels deep.
+
+	:param depth:
+	"""
+
+	root = Element("div")
+	parent = root
+
+	for level in range(depth):
+		item = SubElement(SubElement(parent, "ul"), "li")
+		item.text = f"Level {level}"
+		parent = item
+
+	return root
+
+
+def main() -> None:  # noqa: D103
+	parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+	parser.add_argument("--max-size", type=int, default=10, help="The size of the largest document, in megabytes.")
+	args = parser.parse_args()
+
+	processor = LaTeXTreeProcessor()
+	megabyte = 1024 * 1024
+	sizes = sorted({max(1, args.max_size // divisor) for divisor in (8, 4, 2, 1)})
+
+	for size in sizes:
+		tree = make_tree(size * megabyte)
+
+		start = time.perf_counter()
+		latex = processor.tolatex(tree)
+		duration = time.perf_counter() - start
+
+		print(f"{size:>4} MB: {duration:.2f}s, {duration / size:.3f}s per MB, {len(latex) / megabyte:.1f} MB of LaTeX")
+
+	depth = sys.getrecursionlimit() * 2
+	start = time.perf_counter()
+	processor.tolatex(make_nested_list(depth))
+	print(f"List nested {depth} levels deep: {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+	main()
@@ -51,6 +51,7 @@ def make_document(
 		outfile: PathLike,
 		*elements: Iterable[str],
 		glossary: str = '',
+		preamble: str = '',
 		):
 	r"""
 	Construct a LaTeX document from the given elements.
@@ -58,7 +59,9 @@ def make_document(
 	:param outfile:
 	:param \*elements:
 	:param glossary:
+	:param preamble: Additional LaTeX for the preamble of the document,
+		such as the style definitions from :meth:`CodeHighlighter.style_defs() <.CodeHighlighter.style_defs>`.
 	"""
 
 	outfile = PathPlus(outfile)
-	outfile.write_clean(main_template.render(elements=elements, glossary=glossary))
+	outfile.write_clean(main_template.render(elements=elements, glossary=glossary, preamble=preamble))
@@ -30,10 +30,15 @@
 #
 
 # stdlib
+import concurrent.futures
 import os
 import pathlib
 import re
-from typing import Union
+import time
+from functools import partial
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Tuple, Union
+from urllib.parse import urlparse
+from xml.etree.ElementTree import Element
 
 # 3rd party
 import markdown
@@ -41,55 +46,361 @@ import markdown.treeprocessors
 import markdown.util
 
 # this package
-from py2latex.markdown_parser.images import ImageTextPostProcessor
-from py2latex.markdown_parser.links import LinkTextPostProcessor
-from py2latex.markdown_parser.maths import MathTextPostProcessor
-from py2latex.markdown_parser.tables import TableTextPostProcessor
+from py2latex.markdown_parser import images
+from py2latex.markdown_parser.cache import ConversionCache
+from py2latex.markdown_parser.front_matter import (
+		MarkdownDocument,
+		load_front_matter,
+		read_front_matter,
+		skip_front_matter
+		)
+from py2latex.markdown_parser.handlers import (
+		TagHandler,
+		opaque_tags,
+		register_tag_handler,
+		tag_handlers,
+		tag_handlers_token
+		)
+from py2latex.markdown_parser.highlighting import CodeHighlighter
+from py2latex.markdown_parser.includes import (
+		IncludePreprocessor,
+		IncludeResolver,
+		has_includes,
+		include_resolver,
+		including
+		)
+from py2latex.markdown_parser.incremental import IncrementalConverter
+from py2latex.markdown_parser.inline import register_inline_patterns
+from py2latex.markdown_parser.maths import MathsPostprocessor, MathsPreprocessor
+from py2latex.markdown_parser.pipeline import (
+		BlockPostProcessor,
+		CommentPreprocessor,
+		LaTeXStash,
+		LaTeXStashPostprocessor
+		)
+from py2latex.markdown_parser.pool import MarkdownPool
+from py2latex.markdown_parser.streaming import iter_markdown_sections
+from py2latex.markdown_parser.tables import BooktabsTable, Table2Latex
 from py2latex.markdown_parser.utils import escape_latex_entities, unescape_html_entities
 
 __all__ = [
+		"BooktabsTable",
+		"CodeHighlighter",
+		"ConversionCache",
+		"IncludeResolver",
+		"IncrementalConverter",
 		"LaTeXExtension",
 		"LaTeXTreeProcessor",
+		"MarkdownConversion",
+		"MarkdownDocument",
 		"UnescapeHtmlTextPostProcessor",
 		"gls",
 		"load_markdown",
-		"parse_markdown"
+		"load_markdown_document",
+		"load_markdown_many",
+		"make_markdown",
+		"markdown_pool",
+		"parse_markdown",
+		"read_front_matter",
+		"register_tag_handler",
+		"stream_markdown",
+		"write_markdown",
 		]
 
 
+#: Type hint for the converters which may be used for tables.
+TableConverter = Union[Table2Latex, BooktabsTable]
+
+
 def gls(name):
 	return rf"\gls{{{name}}}"
 
 
-def load_markdown(filename: Union[str, pathlib.Path, os.PathLike]) -> str:
+def load_markdown(
+		filename: Union[str, pathlib.Path, os.PathLike],
+		cache: Optional[ConversionCache] = None,
+		backend: str = "markdown",
+		) -> str:
+	"""
+	Read the given markdown file and convert it to LaTeX.
+
+	Include directives in the file (``!include path.md``) are resolved relative to the file.
+	Any YAML front matter is omitted from the LaTeX; use :func:`~.load_markdown_document` to obtain it.
+
+	:param filename:
+	:param cache: Optional cache of previously converted markdown.
+	:param backend: The parser to use. See :func:`~.parse_markdown`.
+	"""
 
 	if not isinstance(filename, pathlib.Path):
 		filename = pathlib.Path(filename)
 
-	return parse_markdown(filename.read_text())
+	_, string = load_front_matter(filename.read_text(), cache=cache)
 
+	return _convert_file(filename, string, cache=cache, backend=backend)
 
-def parse_markdown(string):
-	out = md.convert(string)
 
-	out = re.sub(r"</?root>", '', out)
+def load_markdown_document(
+		filename: Union[str, pathlib.Path, os.PathLike],
+		cache: Optional[ConversionCache] = None,
+		backend: str = "markdown",
+		) -> MarkdownDocument:
+	"""
+	Read the given markdown file and convert it to LaTeX, returning the metadata from its YAML front matter too.
 
-	out = re.sub(r"gls{([^}]*)}", r"\\gls{\1}", out)
-	out = re.sub(r"citep{([^}]*)}", r"~\\citep{\1}", out)
-	out = re.sub(r"cite{([^}]*)}", r"~\\cite{\1}", out)
+	The metadata can be passed straight to the sectioning functions:
 
-	# text_md = re.sub(r"\*\*(.+)\*\*", r"\\textbf{\1}", text_md)
-	# text_md = re.sub(r"\*(.+)\*", r"\\textit{\1}", text_md)
-	out = re.sub(r"<sup>(.+)</sup>", r"\\textsuperscript{\1}", out)
-	out = re.sub(r"<sub>(.+)</sub>", r"\\textsubscript{\1}", out)
-	out = re.sub(r"<sub>(.+)</sub>", r"\\textsubscript{\1}", out)
+	.. code-block:: python
 
-	return out
+		document = load_markdown_document("introduction.md")
+		latex = document.make_section("chapter")
 
+	:param filename:
+	:param cache: Optional cache of previously converted markdown and parsed front matter.
+	:param backend: The parser to use. See :func:`~.parse_markdown`.
+	"""
 
-class LaTeXExtension(markdown.extensions.Extension):
+	if not isinstance(filename, pathlib.Path):
+		filename = pathlib.Path(filename)
+
+	metadata, string = load_front_matter(filename.read_text(), cache=cache)
+
+	return MarkdownDocument(metadata, _convert_file(filename, string, cache=cache, backend=backend))
+
+
+def _convert_file(filename: pathlib.Path, string: str, cache: Optional[ConversionCache], backend: str) -> str:
+	if not has_includes(string):
+		return parse_markdown(string, cache=cache, backend=backend)
+
+	include_resolver.record(filename, string)
+
+	with including(filename):
+		return parse_markdown(string, cache=cache, backend=backend)
+
+
+def stream_markdown(
+		filename: Union[str, pathlib.Path, os.PathLike],
+		cache: Optional[ConversionCache] = None,
+		max_section_size: int = 1 << 20,
+		backend: str = "markdown",
+		) -> Iterator[str]:
+	"""
+	Read the given markdown file and convert it to LaTeX one section at a time.
+
+	The file is read incrementally and split at headings and other safe block boundaries
+	with :func:`~.iter_markdown_sections`. Each section is converted independently,
+	so only one section of the markdown and its LaTeX need to be held in memory at once.
+	Any YAML front matter is omitted.
+
+	:param filename:
+	:param cache: Optional cache of previously converted markdown.
+	:param max_section_size: The size, in characters, after which a section is ended at the next block boundary.
+	:param backend: The parser to use. See :func:`~.parse_markdown`.
+
+	:returns: An iterator over the LaTeX for each section.
+	"""
+
+	with open(filename, encoding="UTF-8") as fp:
+		for section in iter_markdown_sections(skip_front_matter(fp), max_size=max_section_size):
+			# Entered for each section, as the caller may convert other files between sections.
+			with including(filename):
+				latex = parse_markdown(section, cache=cache, backend=backend)
+
+			yield latex
+
+
+def write_markdown(
+		filename: Union[str, pathlib.Path, os.PathLike],
+		output: Union[str, pathlib.Path, os.PathLike],
+		cache: Optional[ConversionCache] = None,
+		max_section_size: int = 1 << 20,
+		backend: str = "markdown",
+		) -> None:
+	"""
+	Convert the given markdown file to LaTeX, writing each section to ``output`` as it is converted.
+
+	:param filename: The markdown file.
+	:param output: The file to write the LaTeX to.
+	:param cache: Optional cache of previously converted markdown.
+	:param max_section_size: The size, in characters, after which a section is ended at the next block boundary.
+	:param backend: The parser to use. See :func:`~.parse_markdown`.
+
+	.. seealso:: :func:`~.stream_markdown`
+	"""
+
+	with open(output, 'w', encoding="UTF-8") as fp:
+		for idx, latex in enumerate(stream_markdown(filename, cache, max_section_size, backend)):
+			if idx:
+				fp.write("\n\n")
+			fp.write(latex)
+
+		fp.write('\n')
+
+
+class MarkdownConversion(NamedTuple):
+	"""
+	The result of converting a markdown file with :func:`~.load_markdown_many`.
+	"""
+
+	#: The markdown file.
+	path: pathlib.Path
+
+	#: The LaTeX produced from the file.
+	latex: str
+
+	#: The time taken to read and convert the file, in seconds.
+	duration: float
+
+
+def _load_markdown_timed(
+		filename: pathlib.Path,
+		cache: Optional[ConversionCache] = None,
+		backend: str = "markdown",
+		) -> MarkdownConversion:
+	start = time.perf_counter()
+	latex = load_markdown(filename, cache=cache, backend=backend)
+	return MarkdownConversion(filename, latex, time.perf_counter() - start)
+
+
+def load_markdown_many(
+		filenames: Iterable[Union[str, pathlib.Path, os.PathLike]],
+		workers: Optional[int] = None,
+		chunksize: int = 1,
+		cache: Optional[ConversionCache] = None,
+		backend: str = "markdown",
+		) -> List[MarkdownConversion]:
+	"""
+	Read and convert many markdown files to LaTeX, in parallel across a pool of processes.
+
+	:param filenames:
+	:param workers: The number of worker processes. Defaults to the number of CPUs.
+		If ``1`` the files are converted in the current process.
+	:param chunksize: The number of files sent to a worker process at a time.
+		Larger values reduce the overhead for many small files.
+	:param cache: Optional cache of previously converted markdown.
+	:param backend: The parser to use. See :func:`~.parse_markdown`.
+
+	:returns: The result for each file, in the same order as ``filenames``.
+	"""
+
+	paths = [pathlib.Path(filename) for filename in filenames]
+
+	if workers == 1 or len(paths) <= 1:
+		return [_load_markdown_timed(path, cache, backend) for path in paths]
+
+	with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+		convert = partial(_load_markdown_timed, cache=cache, backend=backend)
+		return list(executor.map(convert, paths, chunksize=chunksize))
+
+
+def parse_markdown(string: str, cache: Optional[ConversionCache] = None, backend: str = "markdown") -> str:
+	"""
+	Convert the given markdown source to LaTeX.
+
+	This function is thread-safe.
+	With the default backend each call uses a :class:`markdown.Markdown` instance from :py:data:`~.markdown_pool`.
+
+	:param string:
+	:param cache: Optional cache of previously converted markdown.
+		If ``string`` has been converted before, with the same versions of ``markdown`` and ``py2latex``
+		and the same tag handlers (see :func:`~.register_tag_handler`),
+		the LaTeX is taken from the cache rather than converting it again.
+		Handlers are identified by name, so a handler whose code changes should be registered under a new name,
+		or the cache cleared. The cache also does not distinguish the table converter or code highlighter,
+		so a separate cache should be used if :py:data:`~.markdown_pool` is replaced with differently configured
+		:class:`markdown.Markdown` instances.
+	:param backend: The parser to use. Either ``'markdown'`` for Python-Markdown,
+		or ``'markdown-it'`` for the faster :class:`~.MarkdownItBackend`,
+		which requires the ``markdown-it`` extra.
+		Include directives are only supported by Python-Markdown.
+	"""
+
+	convert = _get_backend(backend)
+
+	# The LaTeX also depends on the included files, which are cached separately by the include resolver.
+	if cache is None or has_includes(string):
+		return convert(string)
+
+	if backend == "markdown":
+		key = cache.key("markdown", tag_handlers_token(), string)
+	else:
+		key = cache.key(f"markdown:{backend}", tag_handlers_token(), string)
+
+	latex = cache.get(key)
+
+	if latex is None:
+		latex = convert(string)
+		cache.set(key, latex)
+
+	return latex
+
+
+_backends: Dict[str, Callable[[str], str]] = {}
+
+
+def _get_backend(backend: str) -> Callable[[str], str]:
+	if backend == "markdown":
+		return markdown_pool.convert
+
+	if backend not in _backends:
+		if backend == "markdown-it":
+			# this package
+			from py2latex.markdown_parser.backends import MarkdownItBackend
 
-	def __init__(self, configs=None):
+			_backends[backend] = MarkdownItBackend().convert
+		else:
+			raise ValueError(f"Unknown markdown backend {backend!r}")
+
+	return _backends[backend]
+
+
+def make_markdown(
+		table_converter: Optional[TableConverter] = None,
+		code_highlighter: Optional[CodeHighlighter] = None,
+		include_resolver: Optional[IncludeResolver] = None,
+		) -> markdown.Markdown:
+	"""
+	Returns a new :class:`markdown.Markdown` instance configured to produce LaTeX.
+
+	:param table_converter: The converter for tables. Defaults to a new :class:`~.Table2Latex`.
+		Pass a :class:`~.BooktabsTable` to give tables ``booktabs`` formatting.
+	:param code_highlighter: Optional highlighter for code blocks.
+		If not given code blocks are converted to ``verbatim`` environments.
+	:param include_resolver: The resolver for include directives.
+		Defaults to :py:data:`py2latex.markdown_parser.includes.include_resolver`.
+	"""
+
+	instance = markdown.Markdown(extensions=["tables", "fenced_code"])
+	extension = LaTeXExtension(
+			table_converter=table_converter,
+			code_highlighter=code_highlighter,
+			include_resolver=include_resolver,
+			)
+	extension.extendMarkdown(instance, markdown.__dict__)
+	return instance
+
+
+class LaTeXExtension(markdown.extensions.Extension):
+	"""
+	Markdown extension to produce LaTeX.
+
+	:param configs:
+	:param table_converter: The converter for tables. Defaults to a new :class:`~.Table2Latex`.
+	:param code_highlighter: Optional highlighter for code blocks.
+	:param include_resolver: The resolver for include directives (``!include path.md``).
+		Defaults to :py:data:`py2latex.markdown_parser.includes.include_resolver`.
+	"""
+
+	def __init__(
+			self,
+			configs=None,
+			table_converter: Optional[TableConverter] = None,
+			code_highlighter: Optional[CodeHighlighter] = None,
+			include_resolver: Optional[IncludeResolver] = None,
+			):
+		self.table_converter = table_converter
+		self.code_highlighter = code_highlighter
+		self.include_resolver = include_resolver
 		self.reset()
 
 	def extendMarkdown(self, md, md_globals):  # type: ignore[override]
@@ -105,31 +416,122 @@ class LaTeXExtension(markdown.extensions.Extension):
 		# footnote_extension = FootnoteExtension()
 		# footnote_extension.extendMarkdown(md, md_globals)
 
-		latex_tp = LaTeXTreeProcessor()
-		math_pp = MathTextPostProcessor()
-		table_pp = TableTextPostProcessor()
-		image_pp = ImageTextPostProcessor()
-		link_pp = LinkTextPostProcessor()
-		unescape_html_pp = UnescapeHtmlTextPostProcessor()
+		# Maths is replaced before raw html blocks are extracted, so maths within them is converted too.
+		maths_preprocessor = MathsPreprocessor(md)
+		md.preprocessors.register(maths_preprocessor, "latex_maths", 25)
+
+		# Finished LaTeX, such as code blocks, which is put back after the block postprocessor has run.
+		latex_stash = LaTeXStash()
+
+		# Runs after fenced code and maths are extracted, so a % within them is not taken as a comment.
+		md.preprocessors.register(CommentPreprocessor(md, latex_stash), "latex_comments", 22)
 
-		md.treeprocessors["latex"] = latex_tp
-		md.postprocessors["unescape_html"] = unescape_html_pp
-		md.postprocessors["math"] = math_pp
-		md.postprocessors["image"] = image_pp
-		md.postprocessors["table"] = table_pp
-		md.postprocessors["link"] = link_pp
+		# Runs after fenced code and raw html are extracted, so directives within them are left alone.
+		md.preprocessors.register(
+				IncludePreprocessor(md, self.include_resolver, latex_stash),
+				"latex_include",
+				15,
+				)
+
+		register_inline_patterns(md)
+
+		md.treeprocessors["latex"] = LaTeXTreeProcessor(
+				md,
+				table_converter=self.table_converter,
+				code_highlighter=self.code_highlighter,
+				latex_stash=latex_stash,
+				maths_preprocessor=maths_preprocessor,
+				)
+		md.postprocessors["latex"] = BlockPostProcessor(table_converter=self.table_converter)
+		md.postprocessors["latex_stash"] = LaTeXStashPostprocessor(md, latex_stash)
+		md.postprocessors["latex_maths"] = MathsPostprocessor(md, maths_preprocessor)
 
 	def reset(self):
 		pass
 
 
+# The html for a code block produced by the ``fenced_code`` extension.
+_code_block_re = re.compile(
+		r'^<pre><code(?: class="(?:language-)?(?P<language>[^" ]+)[^"]*")?>(?P<code>.*)</code></pre>$',
+		flags=re.DOTALL,
+		)
+
+
 class LaTeXTreeProcessor(markdown.treeprocessors.Treeprocessor):
+	"""
+	Markdown tree processor to convert the document to LaTeX.
+
+	:param md:
+	:param handlers: Mapping of tag names to functions which convert elements with that tag to LaTeX.
+		These take precedence over the handlers registered with :func:`~.register_tag_handler`.
+	:param table_converter: The converter for tables. Defaults to a new :class:`~.Table2Latex`.
+	:param code_highlighter: Optional highlighter for code blocks.
+		If not given code blocks are converted to ``verbatim`` environments.
+	:param latex_stash: The stash for the LaTeX of code blocks, which is restored after the block postprocessor runs
+		so the code is not altered by it. Defaults to a new :class:`~.LaTeXStash`.
+	:param maths_preprocessor: The preprocessor which replaced the maths in the document with placeholders,
+		if any. The markdown source of the maths is restored in code blocks before they are converted.
+	"""
+
+	#: Mapping of tag names to functions which convert elements with that tag to LaTeX.
+	#:
+	#: Unless custom handlers were given when the processor was created
+	#: this is the global registry used by :func:`~.register_tag_handler`.
+	handlers: Dict[str, TagHandler]
+
+	#: The converter used for tables.
+	table_converter: TableConverter
+
+	#: The highlighter used for code blocks, if any.
+	code_highlighter: Optional[CodeHighlighter]
+
+	def __init__(
+			self,
+			md: Optional[markdown.Markdown] = None,
+			handlers: Optional[Mapping[str, TagHandler]] = None,
+			table_converter: Optional[TableConverter] = None,
+			code_highlighter: Optional[CodeHighlighter] = None,
+			latex_stash: Optional[LaTeXStash] = None,
+			maths_preprocessor: Optional[MathsPreprocessor] = None,
+			):
+		super().__init__(md)
+
+		self.code_highlighter = code_highlighter
+		self.latex_stash: LaTeXStash = latex_stash or LaTeXStash()
+		self.maths_preprocessor: Optional[MathsPreprocessor] = maths_preprocessor
+
+		if table_converter is None:
+			self.table_converter = Table2Latex()
+		else:
+			self.table_converter = table_converter
+
+		if handlers is None:
+			self.handlers = tag_handlers
+		else:
+			self.handlers = {**tag_handlers, **handlers}
 
 	def run(self, doc):
 		"""
 		Walk the DOM converting relevant nodes to text nodes with relevant content.
 		"""
 
+		# Download any remote images in parallel before converting them one by one.
+		remote_images = [
+				node.get("src") for node in doc.iter("img") if urlparse(node.get("src", '')).scheme in {"http", "https"}
+				]
+		if remote_images:
+			images.image_resolver.resolve_many(remote_images)
+
+		# Fenced code blocks are stored as raw html, and are put back into the document after this processor runs.
+		# They are replaced by placeholders for the LaTeX, which is restored after the block postprocessor.
+		if self.md is not None:
+			raw_blocks = self.md.htmlStash.rawHtmlBlocks
+			for idx, block in enumerate(raw_blocks):
+				match = _code_block_re.match(block) if isinstance(block, str) else None
+				if match:
+					code = unescape_html_entities(match.group("code"))
+					raw_blocks[idx] = self.render_code(code, match.group("language")).strip()
+
 		latex_text = self.tolatex(doc)
 
 		doc.clear()
@@ -137,101 +539,104 @@ class LaTeXTreeProcessor(markdown.treeprocessors.Treeprocessor):
 		latex_node.text = latex_text
 		doc.append(latex_node)
 
-	def tolatex(self, ournode):
-		buffer = ''
-		subcontent = ''
-
-		if ournode.text:
-			subcontent += escape_latex_entities(ournode.text)
-
-		if ournode.getchildren():
-			for child in ournode.getchildren():
-				subcontent += self.tolatex(child)
-
-		if ournode.tag == "h1":
-			buffer += f"\n\\chapter{{{subcontent}}}"
-			buffer += f"'\n\\label{{chapter:{subcontent.lower().replace(' ', '_')}}}\n'"
-
-		elif ournode.tag == "h2":
-			buffer += f"\n\n\\section{{{subcontent}}}"
-			buffer += f"'\n\\label{{section:{subcontent.lower().replace(' ', '_')}}}\n'"
-		elif ournode.tag == "h3":
-			buffer += f"\n\n\\subsection{{{subcontent}}}"
-			buffer += f"'\n\\label{{subsection:{subcontent.lower().replace(' ', '_')}}}\n'"
-		elif ournode.tag == "h4":
-			buffer += f"\n\\subsubsection{{{subcontent}}}"
-			buffer += f"'\n\\label{{subsubsection:{subcontent.lower().replace(' ', '_')}}}\n'"
-		elif ournode.tag == "hr":
-			buffer += "\\noindent\\makebox[\\linewidth]{\\rule{\\linewidth}{0.4pt}}"
-		elif ournode.tag == "ul":
-			# no need for leading \n as one will be provided by li
-			buffer += f"""
-\\begin{{itemize}}{subcontent}
-\\end{{itemize}}
-"""
-		elif ournode.tag == "ol":
-			# no need for leading \n as one will be provided by li
-			buffer += f"""
-\\begin{{enumerate}}{subcontent}
-\\end{{enumerate}}
-"""
-		elif ournode.tag == "li":
-			buffer += f"""
-	\\item {subcontent.strip()}"""
-		elif ournode.tag == "blockquote":
-			# use quotation rather than quote as quotation can support multiple
-			# paragraphs
-			buffer += f"""
-\\begin{{quotation}}
-{subcontent.strip()}
-\\end{{quotation}}
-"""
-		# ignore 'code' when inside pre tags
-		# (mkdn produces <pre><code></code></pre>)
-		elif (
-				ournode.tag == "pre"
-				or (ournode.tag == "pre" and ournode.parentNode.tag != "pre")  # TODO: Take a look here
-				):
-			buffer += f"""
-\\begin{{verbatim}}
-{subcontent.strip()}
-\\end{{verbatim}}
-"""
-		elif ournode.tag == 'q':
-			buffer += f"`{subcontent.strip()}'"
-		elif ournode.tag == 'p':
-			buffer += f"\n{subcontent.strip()}\n"
-		# Footnote processor inserts all of the footnote in a sup tag
-		elif ournode.tag == "sup":
-			buffer += f"\\footnote{{{subcontent.strip()}}}"
-		elif ournode.tag == "strong":
-			buffer += f"\\textbf{{{subcontent.strip()}}}"
-		elif ournode.tag == "em":
-			buffer += f"\\emph{{{subcontent.strip()}}}"
-		# Keep table strcuture. TableTextPostProcessor will take care.
-		elif ournode.tag == "table":
-			buffer += f"\n\n<table>{subcontent}</table>\n\n"
-		elif ournode.tag == "thead":
-			buffer += f"<thead>{subcontent}</thead>"
-		elif ournode.tag == "tbody":
-			buffer += f"<tbody>{subcontent}</tbody>"
-		elif ournode.tag == "tr":
-			buffer += f"<tr>{subcontent}</tr>"
-		elif ournode.tag == "th":
-			buffer += f"<th>{subcontent}</th>"
-		elif ournode.tag == "td":
-			buffer += f"<td>{subcontent}</td>"
-		elif ournode.tag == "img":
-			buffer += f'<img src=\"{ournode.get("src")}\" alt=\"{ournode.get("alt")}\" />'
-		elif ournode.tag == 'a':
-			buffer += f'<a href=\"{ournode.get("href")}\">{subcontent}</a>'
+	def render_code(self, code: str, language: Optional[str] = None) -> str:
+		"""
+		Convert a block of code to LaTeX.
+
+		The code is highlighted with :attr:`~.LaTeXTreeProcessor.code_highlighter`, if set,
+		or otherwise placed in a ``verbatim`` environment.
+		The LaTeX is held in :attr:`~.LaTeXTreeProcessor.latex_stash`, and a placeholder for it is returned.
+
+		:param code:
+		:param language: The name of the language the code is written in, if known.
+		"""
+
+		if self.maths_preprocessor is not None:
+			code = self.maths_preprocessor.restore_source(code)
+
+		if self.code_highlighter is not None:
+			latex = self.code_highlighter.highlight(code.strip(), language).strip()
+		else:
+			latex = f"\\begin{{verbatim}}\n{code.strip()}\n\\end{{verbatim}}"
+
+		return f"\n{self.latex_stash.store(latex)}\n"
+
+	def tolatex(self, ournode) -> str:
+		"""
+		Convert the given node and its descendants to LaTeX.
+
+		The tree is walked with an explicit stack rather than by recursion,
+		so deeply nested documents cannot exceed the recursion limit.
+		The output of each node is accumulated in a list and joined once all of its children have been converted.
+
+		The content of elements whose tags are in :py:data:`~.opaque_tags` is not converted;
+		their handlers work with the elements directly.
+
+		:param ournode:
+		"""
+
+		# Each entry holds a node, an iterator over its children, and the converted parts of its content so far.
+		stack = [self._start_node(ournode)]
+
+		while True:
+			node, children, parts = stack[-1]
+			child = next(children, None)
+
+			if child is not None:
+				stack.append(self._start_node(child))
+				continue
+
+			stack.pop()
+			buffer = self.render_node(node, ''.join(parts))
+
+			if node.tail:
+				buffer += escape_latex_entities(node.tail)
+
+			if not stack:
+				return buffer
+
+			stack[-1][2].append(buffer)
+
+	@staticmethod
+	def _start_node(node) -> Tuple[Element, Iterator[Element], List[str]]:
+		if node.tag in opaque_tags:
+			return node, iter(()), []
+		elif node.text:
+			return node, iter(node), [escape_latex_entities(node.text)]
 		else:
-			buffer = subcontent
+			return node, iter(node), []
 
-		if ournode.tail:
-			buffer += escape_latex_entities(ournode.tail)
+	def render_content(self, node) -> str:
+		"""
+		Convert the content of the given node to LaTeX, excluding the node itself and its tail.
+
+		This allows handlers for tags in :py:data:`~.opaque_tags` to convert the content of
+		individual descendants.
 
-		return buffer
+		:param node:
+		"""
+
+		parts = [escape_latex_entities(node.text)] if node.text else []
+		parts.extend(self.tolatex(child) for child in node)
+		return ''.join(parts)
+
+	def render_node(self, ournode, subcontent: str) -> str:
+		"""
+		Convert a single node to LaTeX, given the LaTeX for its content.
+
+		The conversion is looked up by the node's tag in :attr:`~.LaTeXTreeProcessor.handlers`.
+		Nodes with unknown tags are replaced by their content.
+
+		:param ournode:
+		:param subcontent: The node's text and the converted LaTeX for its children.
+		"""
+
+		handler = self.handlers.get(ournode.tag)
+
+		if handler is None:
+			return subcontent
+		else:
+			return handler(self, ournode, subcontent)
 
 
 class UnescapeHtmlTextPostProcessor(markdown.postprocessors.Postprocessor):
@@ -240,6 +645,8 @@ class UnescapeHtmlTextPostProcessor(markdown.postprocessors.Postprocessor):
 		return unescape_html_entities(text)
 
 
-md = markdown.Markdown()
-latex_mdx = LaTeXExtension()
-latex_mdx.extendMarkdown(md, markdown.__dict__)
+#: The pool of :class:`markdown.Markdown` instances used by :func:`~.parse_markdown`.
+markdown_pool = MarkdownPool(make_markdown)
+
+# Retained for compatibility. Not thread-safe; use :func:`~.parse_markdown` instead.
+md = make_markdown()
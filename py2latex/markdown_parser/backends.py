@@ -0,0 +1,234 @@
+#!/usr/bin/env python
+#
+#  backends.py
+"""
+Alternative parsers for converting markdown to LaTeX.
+
+The LaTeX is produced from an :class:`~xml.etree.ElementTree.Element` tree by :class:`~.LaTeXTreeProcessor`.
+The parsers here build the same tree as Python-Markdown, so the output is the same whichever parser is used.
+"""
+#
+#  Copyright © 2020-2021 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import html
+import re
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
+from xml.etree.ElementTree import Element, SubElement
+
+# 3rd party
+import markdown
+import markdown.treeprocessors
+
+# this package
+from py2latex.markdown_parser import LaTeXTreeProcessor, TableConverter
+from py2latex.markdown_parser.highlighting import CodeHighlighter
+from py2latex.markdown_parser.maths import MathsPostprocessor, MathsPreprocessor
+from py2latex.markdown_parser.pipeline import BlockPostProcessor, CommentPreprocessor, LaTeXStash
+
+if TYPE_CHECKING:
+	# 3rd party
+	from markdown_it.token import Token
+
+__all__ = ["MarkdownItBackend"]
+
+# The same commands as the inline patterns registered by LaTeXExtension.
+_command_re = re.compile(r"(?<!\\)(gls|citep|cite){([^}]*)}")
+
+_script_tags = {"<sup>": "textsuperscript", "<sub>": "textsubscript"}
+_script_end_tags = {"</sup>": "textsuperscript", "</sub>": "textsubscript"}
+
+_html_placeholder = "\x02py2latexhtml{}\x03"
+_html_placeholder_re = re.compile("\x02py2latexhtml([0-9]+)\x03")
+
+_attribute_names = {"href", "src", "alt", "style"}
+
+
+def _append_text(parent: Element, text: str) -> None:
+	if len(parent):
+		parent[-1].tail = (parent[-1].tail or '') + text
+	else:
+		parent.text = (parent.text or '') + text
+
+
+class MarkdownItBackend:
+	"""
+	Converts markdown to LaTeX using
+	`markdown-it-py <https://github.com/executablebooks/markdown-it-py>`_ to parse it.
+
+	This is usually somewhat faster than Python-Markdown, particularly for long documents.
+	It requires the ``markdown-it`` extra to be installed:
+
+	.. code-block:: bash
+
+		python -m pip install py2latex[markdown-it]
+
+	The markdown is parsed according to the CommonMark specification, with tables enabled,
+	so there may be minor differences from Python-Markdown for unusual input.
+
+	:param table_converter: The converter for tables. Defaults to a new :class:`~.Table2Latex` for each document.
+	:param code_highlighter: Optional highlighter for code blocks.
+	"""
+
+	def __init__(
+			self,
+			table_converter: Optional[TableConverter] = None,
+			code_highlighter: Optional[CodeHighlighter] = None,
+			):
+		# 3rd party
+		from markdown_it import MarkdownIt
+
+		self.parser = MarkdownIt("commonmark").enable("table")
+		self.table_converter: Optional[TableConverter] = table_converter
+		self.code_highlighter: Optional[CodeHighlighter] = code_highlighter
+
+		# Adds the same whitespace between block elements as Python-Markdown.
+		self._prettify = markdown.treeprocessors.PrettifyTreeprocessor(markdown.Markdown())
+
+	def convert(self, string: str) -> str:
+		"""
+		Convert the given markdown source to LaTeX.
+
+		:param string:
+		"""
+
+		maths = MathsPreprocessor()
+		latex_stash = LaTeXStash()
+		lines = maths.run(string.split('\n'))
+		source = '\n'.join(CommentPreprocessor(latex_stash=latex_stash).run(lines))
+
+		html_stash: List[str] = []
+		root = self.build_tree(self.parser.parse(source), html_stash)
+		self._prettify.run(root)
+
+		processor = LaTeXTreeProcessor(
+				table_converter=self.table_converter,
+				code_highlighter=self.code_highlighter,
+				latex_stash=latex_stash,
+				maths_preprocessor=maths,
+				)
+		processor.run(root)
+		latex = root[0].text or ''
+
+		if html_stash:
+			latex = _html_placeholder_re.sub(lambda m: html_stash[int(m.group(1))], latex)
+
+		latex = BlockPostProcessor(table_converter=self.table_converter).run(latex)
+		latex = processor.latex_stash.restore(latex)
+		latex = MathsPostprocessor(preprocessor=maths).run(latex)
+
+		return latex.strip()
+
+	def build_tree(self, tokens: Sequence["Token"], html_stash: List[str]) -> Element:
+		"""
+		Build an element tree, equivalent to that produced by Python-Markdown, from the given markdown-it tokens.
+
+		:param tokens:
+		:param html_stash: List to which raw html is added. Each piece of html is replaced
+			by a placeholder in the tree, so it is not escaped.
+		"""
+
+		root = Element("div")
+		stack = [root]
+
+		for token in tokens:
+			if token.nesting == 1:
+				# The paragraphs in tight lists are hidden.
+				if not token.hidden:
+					stack.append(SubElement(stack[-1], token.tag, self._attributes(token)))
+
+			elif token.nesting == -1:
+				if not token.hidden:
+					stack.pop()
+
+			elif token.type == "inline":
+				self._build_inline(token.children or (), stack[-1], html_stash)
+
+			elif token.type in {"fence", "code_block"}:
+				code = SubElement(SubElement(stack[-1], "pre"), "code")
+				code.text = html.escape(token.content, quote=False)
+
+				language = token.info.split(maxsplit=1)[0] if token.info.strip() else ''
+				if language:
+					code.set("class", f"language-{language}")
+
+			elif token.type == "hr":
+				SubElement(stack[-1], "hr")
+
+			elif token.type == "html_block":
+				html_stash.append(token.content.strip())
+				SubElement(stack[-1], 'p').text = _html_placeholder.format(len(html_stash) - 1)
+
+		return root
+
+	def _build_inline(self, tokens: Sequence["Token"], parent: Element, html_stash: List[str]) -> None:
+		stack = [parent]
+
+		for token in tokens:
+			if token.nesting == 1:
+				stack.append(SubElement(stack[-1], token.tag, self._attributes(token)))
+
+			elif token.nesting == -1:
+				stack.pop()
+
+			elif token.type == "text":
+				self._add_text(stack[-1], token.content)
+
+			elif token.type == "softbreak":
+				_append_text(stack[-1], '\n')
+
+			elif token.type == "hardbreak":
+				SubElement(stack[-1], "br")
+
+			elif token.type == "code_inline":
+				SubElement(stack[-1], "code").text = html.escape(token.content, quote=False)
+
+			elif token.type == "image":
+				SubElement(stack[-1], "img", {"src": str(token.attrs.get("src", '')), "alt": token.content})
+
+			elif token.type == "html_inline":
+				tag = token.content.lower()
+
+				if tag in _script_tags:
+					stack.append(SubElement(stack[-1], _script_tags[tag]))
+				elif _script_end_tags.get(tag) == stack[-1].tag and len(stack) > 1:
+					stack.pop()
+				else:
+					html_stash.append(token.content)
+					_append_text(stack[-1], _html_placeholder.format(len(html_stash) - 1))
+
+	@staticmethod
+	def _add_text(parent: Element, text: str) -> None:
+		# Add text to the element, converting glossary references and citations to elements.
+
+		position = 0
+
+		for match in _command_re.finditer(text):
+			_append_text(parent, text[position:match.start()])
+			SubElement(parent, match.group(1), {"key": match.group(2)})
+			position = match.end()
+
+		_append_text(parent, text[position:])
+
+	@staticmethod
+	def _attributes(token: "Token") -> Dict[str, Any]:
+		return {name: str(value) for name, value in token.attrs.items() if name in _attribute_names}
@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+#
+#  cache.py
+"""
+Persistent on-disk cache for the results of converting markdown to LaTeX.
+"""
+#
+#  Copyright © 2020 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import hashlib
+import os
+import pathlib
+import tempfile
+from typing import Optional, Union
+
+# 3rd party
+import markdown
+
+# this package
+from py2latex import __version__
+
+__all__ = ["ConversionCache", "default_cache_dir"]
+
+
+def default_cache_dir() -> pathlib.Path:
+	"""
+	Returns the default directory for :class:`~.ConversionCache`.
+
+	This is ``py2latex`` within ``$XDG_CACHE_HOME``, or within ``~/.cache`` if that is unset.
+	"""
+
+	cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser('~'), ".cache")
+	return pathlib.Path(cache_home) / "py2latex"
+
+
+class ConversionCache:
+	"""
+	Cache of converted LaTeX, stored as files in a local directory so it persists across processes.
+
+	Entries are keyed by a hash of their content, together with the versions of ``markdown`` and ``py2latex``,
+	so upgrading either invalidates the cache.
+	Once the total size of the cache exceeds ``max_size``
+	the least recently used entries are removed.
+
+	:param directory: The directory to store the cache in. Defaults to :func:`~.default_cache_dir`.
+	:param max_size: The maximum total size of the cache, in bytes.
+	"""
+
+	def __init__(
+			self,
+			directory: Union[str, pathlib.Path, os.PathLike, None] = None,
+			max_size: int = 256 * 1024 * 1024,
+			):
+
+		if directory is None:
+			directory = default_cache_dir()
+
+		self.directory: pathlib.Path = pathlib.Path(directory)
+		self.max_size: int = max_size
+
+		self._size: Optional[int] = None
+
+	def key(self, namespace: str, *parts: Union[str, bytes]) -> str:
+		"""
+		Returns the key for an entry with the given content.
+
+		:param namespace: The kind of entry, e.g. ``"markdown"``.
+		:param parts: The content the entry is derived from.
+		"""
+
+		digest = hashlib.sha256()
+
+		for part in (namespace, markdown.__version__, __version__, *parts):
+			if isinstance(part, str):
+				part = part.encode("UTF-8")
+			digest.update(len(part).to_bytes(8, "little"))
+			digest.update(part)
+
+		return digest.hexdigest()
+
+	def _path(self, key: str) -> pathlib.Path:
+		return self.directory / key[:2] / f"{key}.tex"
+
+	def get(self, key: str) -> Optional[str]:
+		"""
+		Returns the entry with the given key, or :py:obj:`None` if it is not in the cache.
+
+		:param key:
+		"""
+
+		path = self._path(key)
+
+		try:
+			value = path.read_text(encoding="UTF-8")
+		except FileNotFoundError:
+			return None
+
+		try:
+			# Record the use of the entry, for eviction.
+			os.utime(path)
+		except OSError:
+			pass
+
+		return value
+
+	def set(self, key: str, value: str) -> None:
+		"""
+		Store an entry in the cache.
+
+		:param key:
+		:param value:
+		"""
+
+		path = self._path(key)
+		path.parent.mkdir(parents=True, exist_ok=True)
+
+		# Write to a temporary file first so other processes never see a partial entry.
+		fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+		try:
+			with os.fdopen(fd, 'w', encoding="UTF-8") as fp:
+				fp.write(value)
+			os.replace(tmp_name, path)
+		except BaseException:
+			os.unlink(tmp_name)
+			raise
+
+		if self._size is None:
+			self.evict()
+		else:
+			self._size += path.stat().st_size
+			if self._size > self.max_size:
+				self.evict()
+
+	def evict(self) -> None:
+		"""
+		Remove the least recently used entries until the cache is no larger than ``max_size``.
+		"""
+
+		entries = []
+
+		for path in self.directory.glob("*/*.tex"):
+			try:
+				stat = path.stat()
+			except FileNotFoundError:
+				continue
+			entries.append((stat.st_mtime, stat.st_size, path))
+
+		size = sum(entry[1] for entry in entries)
+
+		if size > self.max_size:
+			for _, entry_size, path in sorted(entries):
+				try:
+					path.unlink()
+				except FileNotFoundError:
+					pass
+				size -= entry_size
+				if size <= self.max_size:
+					break
+
+		self._size = size
+
+	def clear(self) -> None:
+		"""
+		Remove all entries from the cache.
+		"""
+
+		for path in self.directory.glob("*/*.tex"):
+			try:
+				path.unlink()
+			except FileNotFoundError:
+				pass
+
+		self._size = 0
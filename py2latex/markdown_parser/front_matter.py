@@ -0,0 +1,287 @@
+#!/usr/bin/env python
+#
+#  front_matter.py
+"""
+YAML front matter in markdown files.
+
+The front matter is a YAML mapping between two ``---`` lines at the very start of the file:
+
+.. code-block:: markdown
+
+	---
+	title: Introduction
+	label: chapter:intro
+	shorttitle: Intro
+	unnumbered: false
+	---
+
+	The body of the chapter...
+
+The ``title``, ``label``, ``shorttitle`` and ``unnumbered`` keys
+are passed to the sectioning functions by :meth:`.MarkdownDocument.make_section`.
+Other keys are available in :attr:`.MarkdownDocument.metadata`.
+"""
+#
+#  Copyright © 2020-2021 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import itertools
+import json
+import os
+import pathlib
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+# 3rd party
+import yaml
+
+# this package
+from py2latex import sectioning
+from py2latex.markdown_parser.cache import ConversionCache
+
+__all__ = [
+		"MarkdownDocument",
+		"load_front_matter",
+		"parse_front_matter",
+		"read_front_matter",
+		"skip_front_matter",
+		"split_front_matter",
+		]
+
+# The C loader, from libyaml, is many times faster than the pure Python one.
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+_delimiters = {"---", "..."}
+
+_sectioning_functions = {
+		"part": sectioning.make_part,
+		"chapter": sectioning.make_chapter,
+		"section": sectioning.make_section,
+		"subsection": sectioning.make_subsection,
+		"subsubsection": sectioning.make_subsubsection,
+		"paragraph": sectioning.make_paragraph,
+		"subparagraph": sectioning.make_subparagraph,
+		}
+
+
+def split_front_matter(string: str) -> Tuple[str, str]:
+	"""
+	Split the YAML front matter from the start of the given markdown.
+
+	This only looks for the delimiters; the front matter is not checked to be a YAML mapping.
+	Use :func:`~.load_front_matter` to split and parse it.
+
+	:param string:
+
+	:returns: The YAML source of the front matter, which is empty if there is none, and the remaining markdown.
+	"""
+
+	if not string.startswith("---"):
+		return '', string
+
+	lines = string.split('\n')
+
+	if lines[0].rstrip() != "---":
+		return '', string
+
+	for idx, line in enumerate(lines[1:], start=1):
+		if line.rstrip() in _delimiters:
+			return '\n'.join(lines[1:idx]), '\n'.join(lines[idx + 1:])
+
+	# No closing delimiter, so the opening line is a horizontal rule.
+	return '', string
+
+
+def _load_mapping(front_matter: str, cache: Optional[ConversionCache]) -> Optional[Dict[str, Any]]:
+	# Returns None if the text is not a YAML mapping, in which case it is not front matter.
+
+	if not front_matter.strip():
+		return None
+
+	key = None
+
+	if cache is not None:
+		key = cache.key("front_matter", front_matter)
+		cached = cache.get(key)
+		if cached is not None:
+			return json.loads(cached)
+
+	try:
+		metadata = yaml.load(front_matter, Loader=_Loader)
+	except yaml.YAMLError:
+		return None
+
+	if not isinstance(metadata, dict):
+		return None
+
+	if cache is not None and key is not None:
+		try:
+			cache.set(key, json.dumps(metadata))
+		except TypeError:
+			pass
+
+	return metadata
+
+
+def parse_front_matter(front_matter: str, cache: Optional[ConversionCache] = None) -> Dict[str, Any]:
+	"""
+	Parse the YAML source of the front matter.
+
+	:param front_matter:
+	:param cache: Optional cache of previously parsed front matter.
+		Metadata which cannot be stored as JSON, such as dates, is parsed every time.
+
+	:raises ValueError: If the front matter is not a YAML mapping.
+	"""
+
+	if not front_matter.strip():
+		return {}
+
+	metadata = _load_mapping(front_matter, cache)
+
+	if metadata is None:
+		raise ValueError("The front matter must be a YAML mapping.")
+
+	return metadata
+
+
+def load_front_matter(string: str, cache: Optional[ConversionCache] = None) -> Tuple[Dict[str, Any], str]:
+	"""
+	Split the YAML front matter from the start of the given markdown and parse it.
+
+	Text between ``---`` lines which is not a YAML mapping, such as a paragraph between two horizontal rules,
+	is not front matter, and is left in the markdown.
+
+	:param string:
+	:param cache: Optional cache of previously parsed front matter.
+
+	:returns: The metadata, which is empty if there is no front matter, and the remaining markdown.
+	"""
+
+	front_matter, body = split_front_matter(string)
+	metadata = _load_mapping(front_matter, cache)
+
+	if metadata is None:
+		return {}, string
+
+	return metadata, body
+
+
+def skip_front_matter(lines: Iterable[str]) -> Iterator[str]:
+	"""
+	Returns an iterator over the given lines of markdown, omitting any YAML front matter at the start.
+
+	Only the front matter is read ahead, so this may be used when reading a file incrementally.
+
+	:param lines:
+	"""
+
+	lines = iter(lines)
+	first_line = next(lines, None)
+
+	if first_line is None:
+		return iter(())
+
+	if first_line.rstrip() != "---":
+		return itertools.chain([first_line], lines)
+
+	front_matter: List[str] = []
+
+	for line in lines:
+		if line.rstrip() in _delimiters:
+			if _load_mapping(''.join(front_matter), None) is not None:
+				return lines
+
+			return itertools.chain([first_line], front_matter, [line], lines)
+
+		front_matter.append(line)
+
+	return itertools.chain([first_line], front_matter)
+
+
+def read_front_matter(
+		filename: Union[str, pathlib.Path, os.PathLike],
+		cache: Optional[ConversionCache] = None,
+		) -> Dict[str, Any]:
+	"""
+	Returns the metadata from the YAML front matter of the given markdown file.
+
+	Only the front matter is read from the file, so this is much faster than converting it
+	when scanning the metadata of many files.
+
+	:param filename:
+	:param cache: Optional cache of previously parsed front matter.
+	"""
+
+	lines: List[str] = []
+
+	with open(filename, encoding="UTF-8") as fp:
+		if fp.readline().rstrip() != "---":
+			return {}
+
+		for line in fp:
+			if line.rstrip() in _delimiters:
+				return _load_mapping(''.join(lines), cache) or {}
+			lines.append(line)
+
+	return {}
+
+
+class MarkdownDocument(NamedTuple):
+	"""
+	A markdown document converted with :func:`~.load_markdown_document`.
+	"""
+
+	#: The metadata from the YAML front matter of the document.
+	metadata: Dict[str, Any]
+
+	#: The LaTeX produced from the body of the document.
+	body: str
+
+	def make_section(self, section_type: str = "chapter", **kwargs) -> str:
+		"""
+		Returns the LaTeX for the document as a chapter or other sectioning unit,
+		with the title, label, short title and ``unnumbered`` flag from the front matter.
+
+		:param section_type: The kind of sectioning unit, e.g. ``'chapter'`` or ``'section'``.
+		:param kwargs: Arguments for the sectioning function, which take precedence over the front matter.
+
+		:raises ValueError: If no title is given and the front matter has no ``title``.
+		"""
+
+		if section_type not in _sectioning_functions:
+			raise ValueError(f"Unknown section type {section_type!r}")
+
+		arguments = {"body": self.body}
+
+		for name in ("title", "label", "shorttitle", "unnumbered"):
+			if name in self.metadata:
+				arguments[name] = self.metadata[name]
+
+		if "short_title" in self.metadata and "shorttitle" not in arguments:
+			arguments["shorttitle"] = self.metadata["short_title"]
+
+		arguments.update(kwargs)
+
+		if not arguments.get("title"):
+			raise ValueError("No title given, and the front matter has no 'title'.")
+
+		return _sectioning_functions[section_type](**arguments)
@@ -0,0 +1,240 @@
+#!/usr/bin/env python
+#
+#  handlers.py
+"""
+Functions for converting individual markdown elements to LaTeX.
+"""
+#
+#  Copyright © 2020-2021 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+#  Parts based on https://github.com/rufuspollock/markdown2latex
+#  BSD Licensed
+#  Authored by Rufus Pollock: <http://www.rufuspollock.org/>
+#  Reworked by Julian Wulfheide (ju.wulfheide@gmail.com) and
+#  Pedro Gaudencio (pmgaudencio@gmail.com)
+#
+# stdlib
+import re
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Set
+from xml.etree.ElementTree import Element
+
+# this package
+from py2latex.markdown_parser.images import image_to_latex
+from py2latex.markdown_parser.links import link_to_latex
+from py2latex.markdown_parser.utils import unescape_html_entities
+
+if TYPE_CHECKING:
+	# this package
+	from py2latex.markdown_parser import LaTeXTreeProcessor
+
+__all__ = ["TagHandler", "opaque_tags", "register_tag_handler", "tag_handlers", "tag_handlers_token"]
+
+#: Type hint for a function which converts an element to LaTeX.
+#:
+#: The function is called with the tree processor, the element,
+#: and the LaTeX for the element's text and children,
+#: and returns the LaTeX for the element (excluding its tail).
+TagHandler = Callable[["LaTeXTreeProcessor", Element, str], str]
+
+#: Mapping of tag names to the functions which convert elements with that tag to LaTeX.
+#:
+#: Elements whose tags are not in this mapping are replaced by their content.
+tag_handlers: Dict[str, TagHandler] = {}
+
+#: Tags whose handlers convert the element's children themselves.
+#:
+#: The children of these elements are not converted before calling the handler,
+#: which is passed an empty string for ``subcontent``.
+opaque_tags: Set[str] = set()
+
+
+def register_tag_handler(tag: str, handler: Optional[TagHandler] = None, *, descend: bool = True) -> Callable:
+	r"""
+	Register a function to convert elements with the given tag to LaTeX.
+
+	Any existing handler for the tag is replaced.
+	Can also be used as a decorator:
+
+	.. code-block:: python
+
+		@register_tag_handler("code")
+		def code(processor, node, subcontent):
+			return rf"\texttt{{{subcontent}}}"
+
+	:param tag:
+	:param handler:
+	:param descend: If :py:obj:`False` the element's children are not converted before calling the handler,
+		for handlers which convert the children themselves.
+	"""
+
+	def register(handler: TagHandler) -> TagHandler:
+		tag_handlers[tag] = handler
+
+		if descend:
+			opaque_tags.discard(tag)
+		else:
+			opaque_tags.add(tag)
+
+		return handler
+
+	if handler is None:
+		return register
+	else:
+		return register(handler)
+
+
+def tag_handlers_token() -> str:
+	"""
+	Returns a string identifying the registered tag handlers, for keys in a :class:`~.ConversionCache`.
+
+	Handlers are identified by their qualified names, so a change to the code of a handler is not detected.
+	"""
+
+	return ';'.join(
+			f"{tag}={getattr(handler, '__module__', '')}.{getattr(handler, '__qualname__', repr(handler))}"
+			f"{'!' if tag in opaque_tags else ''}"
+			for tag, handler in sorted(tag_handlers.items())
+			)
+
+
+def _heading(section_type: str, leading: str) -> TagHandler:
+
+	def handler(processor: "LaTeXTreeProcessor", node: Element, subcontent: str) -> str:
+		label = subcontent.lower().replace(' ', '_')
+		return f"{leading}\\{section_type}{{{subcontent}}}'\n\\label{{{section_type}:{label}}}\n'"
+
+	return handler
+
+
+register_tag_handler("h1", _heading("chapter", '\n'))
+register_tag_handler("h2", _heading("section", "\n\n"))
+register_tag_handler("h3", _heading("subsection", "\n\n"))
+register_tag_handler("h4", _heading("subsubsection", '\n'))
+
+
+@register_tag_handler("hr")
+def _hr(processor: "LaTeXTreeProcessor", node: Element, subcontent: str) -> str:
+	return "\\noindent\\makebox[\\linewidth]{\\rule{\\linewidth}{0.4pt}}"
+
+
+@register_tag_handler("ul")
+def _ul(processor: "LaTeXTreeProcessor", node: Element, subcontent: str) -> str:
+	# no need for leading \n as one will be provided by li
+	return f"\n\\begin{{itemize}}{subcontent}\n\\end{{itemize}}\n"
+
+
+@register_tag_handler("ol")
+def _ol(processor: "LaTeXTreeProcessor", node: Element, subcontent: str) -> str:
+	# no need for leading \n as one will be provided by li
+	return f"\n\\begin{{enumerate}}{subcontent}\n\\end{{enumerate}}\n"
+
+
+@register_tag_handler("li")
+def _li(processor: "LaTeXTreeProcessor", node: Element, subcontent: str) -> str:
+	return f"\n\t\\item {subcontent.strip()}"
+
+
+@register_tag_handler("blockquote")
+def _blockquote(processor: "LaTeXTreeProcessor", node: Element, subcontent: str) -> str:
+	# use quotation rather than quote as quotation can support multiple paragraphs
+	return f"\n\\begin{{quotation}}\n{subcontent.strip()}\n\\end{{quotation}}\n"
+
+
+_language_re = re.compile(r"(?:^|\s)language-(\S+)")
+
+
+# ignore 'code' when inside pre tags
+# (mkdn produces <pre><code></code></pre>)
+@register_tag_handler("pre", descend=False)
+def _pre(processor: "LaTeXTreeProcessor", node: Element, subcontent: str) -> str:
+	# The content of code blocks must not be escaped.
+	code = unescape_html_entities(''.join(node.itertext()))
+
+	language = None
+	code_element = node.find("code")
+	if code_element is not None:
+		match = _language_re.search(code_element.get("class", ''))
+		if match:
+			language = match.group(1)
+
+	return processor.render_code(code, language)
+
+
+@register_tag_handler('q')
+def _q(processor: "LaTeXTreeProcessor", node: Element, subcontent: str) -> str:
+	return f"`{subcontent.strip()}'"
+
+
+@register_tag_handler('p')
+def _p(processor: "LaTeXTreeProcessor", node: Element, subcontent: str) -> str:
+	return f"\n{subcontent.strip()}\n"
+
+
+# Footnote processor inserts all of the footnote in a sup tag
+@register_tag_handler("sup")
+def _sup(processor: "LaTeXTreeProcessor", node: Element, subcontent: str) -> str:
+	return f"\\footnote{{{subcontent.strip()}}}"
+
+
+def _command(prefix: str = '') -> TagHandler:
+	# Handler for the elements created by CommandInlineProcessor
+
+	def handler(processor: "LaTeXTreeProcessor", node: Element, subcontent: str) -> str:
+		return f"{prefix}\\{node.tag}{{{node.get('key', '')}}}"
+
+	return handler
+
+
+register_tag_handler("gls", _command())
+register_tag_handler("cite", _command('~'))
+register_tag_handler("citep", _command('~'))
+
+
+@register_tag_handler("textsuperscript")
+@register_tag_handler("textsubscript")
+def _text_script(processor: "LaTeXTreeProcessor", node: Element, subcontent: str) -> str:
+	return f"\\{node.tag}{{{subcontent}}}"
+
+
+@register_tag_handler("strong")
+def _strong(processor: "LaTeXTreeProcessor", node: Element, subcontent: str) -> str:
+	return f"\\textbf{{{subcontent.strip()}}}"
+
+
+@register_tag_handler("em")
+def _em(processor: "LaTeXTreeProcessor", node: Element, subcontent: str) -> str:
+	return f"\\emph{{{subcontent.strip()}}}"
+
+
+@register_tag_handler("table", descend=False)
+def _table(processor: "LaTeXTreeProcessor", node: Element, subcontent: str) -> str:
+	latex_table = processor.table_converter.convert_element(node, processor.render_content)
+	return f"\n\n{latex_table.strip()}\n\n"
+
+
+@register_tag_handler("img")
+def _img(processor: "LaTeXTreeProcessor", node: Element, subcontent: str) -> str:
+	return image_to_latex(node.get("src", ''), node.get("alt", '')).strip()
+
+
+@register_tag_handler('a')
+def _a(processor: "LaTeXTreeProcessor", node: Element, subcontent: str) -> str:
+	return link_to_latex(node.get("href", ''), subcontent, ''.join(node.itertext()))
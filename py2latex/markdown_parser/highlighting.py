@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+#
+#  highlighting.py
+"""
+Syntax highlighting of code blocks with Pygments.
+"""
+#
+#  Copyright © 2020-2021 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+from typing import Optional
+
+# this package
+from py2latex.markdown_parser.cache import ConversionCache
+
+__all__ = ["CodeHighlighter"]
+
+
+class CodeHighlighter:
+	"""
+	Highlights code blocks with Pygments' LaTeX formatter when the markdown is converted.
+
+	Unlike ``minted``, the document can then be compiled without ``-shell-escape``
+	and without running Pygments again on every compile.
+	Pygments is required, and is available as the ``highlighting`` extra.
+
+	The highlighted code uses the ``fancyvrb`` and ``color`` packages,
+	and macros defined by :meth:`~.CodeHighlighter.style_defs`,
+	which should be added to the preamble of the document once. For example:
+
+	.. code-block:: python
+
+		highlighter = CodeHighlighter(style="friendly", cache=ConversionCache())
+		md = make_markdown(code_highlighter=highlighter)
+
+		make_document("document.tex", md.convert(source), preamble=highlighter.style_defs())
+
+	:param style: The name of the Pygments style.
+	:param cache: Optional cache of previously highlighted code.
+		Entries are keyed by the code, the lexer and the style.
+	"""
+
+	def __init__(self, style: str = "default", cache: Optional[ConversionCache] = None):
+		# 3rd party
+		import pygments
+		from pygments.formatters.latex import LatexFormatter
+
+		self.style: str = style
+		self.cache: Optional[ConversionCache] = cache
+		self.formatter = LatexFormatter(style=style)
+		self._pygments_version: str = pygments.__version__
+
+	def highlight(self, code: str, language: Optional[str] = None) -> str:
+		"""
+		Returns the LaTeX for the given code, highlighted with Pygments.
+
+		:param code:
+		:param language: The name of the language, e.g. ``'python'``.
+			If not given, or if Pygments has no lexer for the language, the code is not highlighted.
+		"""
+
+		# 3rd party
+		import pygments
+		from pygments.lexers import TextLexer, get_lexer_by_name
+		from pygments.util import ClassNotFound
+
+		try:
+			lexer = get_lexer_by_name(language) if language else TextLexer()
+		except ClassNotFound:
+			lexer = TextLexer()
+
+		if self.cache is None:
+			return pygments.highlight(code, lexer, self.formatter)
+
+		key = self.cache.key("pygments", code, lexer.name, self.style, self._pygments_version)
+		latex = self.cache.get(key)
+
+		if latex is None:
+			latex = pygments.highlight(code, lexer, self.formatter)
+			self.cache.set(key, latex)
+
+		return latex
+
+	def style_defs(self) -> str:
+		"""
+		Returns the LaTeX for the preamble of the document, which loads the required packages
+		and defines the macros used by the highlighted code.
+		"""
+
+		return '\n'.join([
+				r"\usepackage{fancyvrb}",
+				r"\usepackage{color}",
+				self.formatter.get_style_defs(),
+				])
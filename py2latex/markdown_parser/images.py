@@ -30,20 +30,33 @@
 #
 
 # stdlib
+import concurrent.futures
+import hashlib
 import http.client
+import json
 import os
+import pathlib
+import posixpath
 import tempfile
-import urllib.error
-import urllib.parse
-import urllib.request
+import threading
 import xml.dom.minidom
-from typing import List
-from urllib.parse import urlparse
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from urllib.parse import urljoin, urlparse
 
 # 3rd party
 import markdown.postprocessors
 
-__all__ = ["ImageTextPostProcessor", "img_to_latex"]
+# this package
+from py2latex.markdown_parser.cache import default_cache_dir
+
+__all__ = [
+		"ImageResolver",
+		"ImageTextPostProcessor",
+		"convert_image_block",
+		"image_resolver",
+		"image_to_latex",
+		"img_to_latex",
+		]
 
 
 class ImageTextPostProcessor(markdown.postprocessors.Postprocessor):
@@ -57,39 +70,316 @@ class ImageTextPostProcessor(markdown.postprocessors.Postprocessor):
 		(that is separated by at least one blank line above and below).
 		"""
 
-		new_blocks: List[str] = []
+		return "\n\n".join([convert_image_block(block) for block in instr.split("\n\n")])
+
+
+def convert_image_block(block: str) -> str:
+	"""
+	Convert the ``img`` tag in the given block to LaTeX, if the block consists of an image.
+
+	:param block:
+	"""
+
+	stripped = block.strip()
+
+	if stripped.startswith("<img"):
+		return img_to_latex(stripped).strip()
+	else:
+		return block
+
+
+class ImageResolver:
+	"""
+	Downloads remote images into a persistent, content-addressed cache.
+
+	Each image is stored under the hash of its content, and an index maps each URL to its file
+	along with the ``ETag`` and ``Last-Modified`` headers it was served with.
+	Images already in the cache are revalidated with a conditional request
+	rather than being downloaded again, and each URL is only requested once per :class:`~.ImageResolver`.
+
+	Connections are reused for requests to the same host, and :meth:`~.ImageResolver.resolve_many`
+	downloads images in parallel.
+
+	:param directory: The directory to store the images in. Defaults to ``images`` within :func:`~.default_cache_dir`.
+	:param offline: If :py:obj:`True` no requests are made, and only images already in the cache are used.
+	:param timeout: The timeout for each request, in seconds.
+	:param workers: The maximum number of images to download at once.
+	"""
+
+	#: The maximum number of redirects followed for each image.
+	max_redirects: int = 5
+
+	def __init__(
+			self,
+			directory: Union[str, pathlib.Path, os.PathLike, None] = None,
+			*,
+			offline: bool = False,
+			timeout: float = 10.0,
+			workers: int = 8,
+			):
+
+		if directory is None:
+			directory = default_cache_dir() / "images"
+
+		self.directory: pathlib.Path = pathlib.Path(directory)
+		self.offline: bool = offline
+		self.timeout: float = timeout
+		self.workers: int = workers
+
+		self._index: Optional[Dict[str, Dict[str, str]]] = None
+		self._resolved: Dict[str, Optional[pathlib.Path]] = {}
+		self._lock = threading.Lock()
+		self._local = threading.local()
+
+	@property
+	def _index_file(self) -> pathlib.Path:
+		return self.directory / "index.json"
+
+	def _load_index(self) -> Dict[str, Dict[str, str]]:
+		if self._index is None:
+			try:
+				self._index = json.loads(self._index_file.read_text(encoding="UTF-8"))
+			except (FileNotFoundError, ValueError):
+				self._index = {}
+
+		return self._index
+
+	def _save_index(self) -> None:
+		self.directory.mkdir(parents=True, exist_ok=True)
+		fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+
+		with os.fdopen(fd, 'w', encoding="UTF-8") as fp:
+			json.dump(self._load_index(), fp, indent=2)
+
+		os.replace(tmp_name, self._index_file)
+
+	def cached(self, url: str) -> Optional[pathlib.Path]:
+		"""
+		Returns the cached file for the image at ``url``, or :py:obj:`None` if it is not in the cache.
+
+		:param url:
+		"""
+
+		with self._lock:
+			entry = self._load_index().get(url)
+
+		if entry is not None:
+			path = self.directory / entry["file"]
+			if path.is_file():
+				return path
+
+		return None
+
+	def resolve(self, url: str) -> Optional[pathlib.Path]:
+		"""
+		Returns the local file for the image at ``url``, downloading it if required.
+
+		:param url:
+
+		:returns: The path to the image, or :py:obj:`None` if it could not be obtained.
+		"""
+
+		if url in self._resolved:
+			return self._resolved[url]
+
+		if self.offline:
+			path = self.cached(url)
+		else:
+			path = self._fetch(url, self._local.__dict__.setdefault("connections", {}))
+
+			with self._lock:
+				self._save_index()
+
+		self._resolved[url] = path
+		return path
+
+	def resolve_many(self, urls: Iterable[str]) -> Dict[str, Optional[pathlib.Path]]:
+		"""
+		Resolve the images at the given URLs, downloading them in parallel.
+
+		:param urls:
 
-		for block in instr.split("\n\n"):
-			stripped = block.strip()
-			# <table catches modified verions (e.g. <table class="..">
-			if stripped.startswith("<img"):
-				latex_img = img_to_latex(stripped).strip()
-				new_blocks.append(latex_img)
+		:returns: Mapping of each URL to its local file, or :py:obj:`None` if it could not be obtained.
+		"""
+
+		pending = [url for url in dict.fromkeys(urls) if url not in self._resolved]
+
+		if self.offline or len(pending) <= 1:
+			for url in pending:
+				self.resolve(url)
+		else:
+			# The connections of each worker thread, which are closed once the downloads have finished.
+			worker_connections: List[Dict[Tuple[str, str], http.client.HTTPConnection]] = []
+			local = threading.local()
+
+			def fetch(url: str) -> Optional[pathlib.Path]:
+				if not hasattr(local, "connections"):
+					local.connections = {}
+					with self._lock:
+						worker_connections.append(local.connections)
+
+				return self._fetch(url, local.connections)
+
+			try:
+				with concurrent.futures.ThreadPoolExecutor(max_workers=self.workers) as executor:
+					for url, path in zip(pending, executor.map(fetch, pending)):
+						self._resolved[url] = path
+			finally:
+				for connections in worker_connections:
+					for conn in connections.values():
+						conn.close()
+
+			with self._lock:
+				self._save_index()
+
+		return {url: self._resolved[url] for url in urls}
+
+	def close(self) -> None:
+		"""
+		Close the connections opened by :meth:`~.ImageResolver.resolve` in the current thread.
+		"""
+
+		connections = self._local.__dict__.pop("connections", {})
+
+		for conn in connections.values():
+			conn.close()
+
+	def _connection(
+			self,
+			scheme: str,
+			netloc: str,
+			connections: Dict[Tuple[str, str], http.client.HTTPConnection],
+			) -> http.client.HTTPConnection:
+		if (scheme, netloc) not in connections:
+			if scheme == "https":
+				connections[(scheme, netloc)] = http.client.HTTPSConnection(netloc, timeout=self.timeout)
+			else:
+				connections[(scheme, netloc)] = http.client.HTTPConnection(netloc, timeout=self.timeout)
+
+		return connections[(scheme, netloc)]
+
+	def _request(
+			self,
+			url: str,
+			headers: Dict[str, str],
+			connections: Dict[Tuple[str, str], http.client.HTTPConnection],
+			) -> Tuple[http.client.HTTPResponse, bytes]:
+		parsed = urlparse(url)
+		target = parsed.path or '/'
+		if parsed.query:
+			target = f"{target}?{parsed.query}"
+
+		for attempt in range(2):
+			conn = self._connection(parsed.scheme, parsed.netloc, connections)
+			try:
+				conn.request("GET", target, headers=headers)
+				response = conn.getresponse()
+				return response, response.read()
+			except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+				# The server closed a reused connection; retry once on a fresh one.
+				conn.close()
+				if attempt:
+					raise
+
+		raise AssertionError("unreachable")
+
+	def _fetch(
+			self,
+			url: str,
+			connections: Dict[Tuple[str, str], http.client.HTTPConnection],
+			) -> Optional[pathlib.Path]:
+		cached = self.cached(url)
+
+		with self._lock:
+			entry = dict(self._load_index().get(url, {}))
+
+		headers = {}
+		if cached is not None:
+			if "etag" in entry:
+				headers["If-None-Match"] = entry["etag"]
+			if "last_modified" in entry:
+				headers["If-Modified-Since"] = entry["last_modified"]
+
+		location = url
+
+		try:
+			for _ in range(self.max_redirects + 1):
+				if urlparse(location).scheme not in {"http", "https"}:
+					return cached
+
+				response, body = self._request(location, headers, connections)
+
+				if response.status in {301, 302, 303, 307, 308} and response.getheader("Location"):
+					location = urljoin(location, response.getheader("Location"))
+					continue
+
+				break
 			else:
-				new_blocks.append(block)
+				return cached
+
+		except (OSError, http.client.HTTPException):
+			return cached
+
+		if response.status == 304:
+			return cached
+		elif response.status != 200:
+			return cached
+
+		suffix = posixpath.splitext(urlparse(location).path)[1]
+		filename = hashlib.sha256(body).hexdigest() + suffix
+		path = self.directory / filename
 
-		return "\n\n".join(new_blocks)
+		if not path.is_file():
+			self.directory.mkdir(parents=True, exist_ok=True)
+			fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+			with os.fdopen(fd, "wb") as fp:
+				fp.write(body)
+			os.replace(tmp_name, path)
+
+		new_entry = {"file": filename}
+		if response.getheader("ETag"):
+			new_entry["etag"] = response.getheader("ETag")  # type: ignore[assignment]
+		if response.getheader("Last-Modified"):
+			new_entry["last_modified"] = response.getheader("Last-Modified")  # type: ignore[assignment]
+
+		with self._lock:
+			self._load_index()[url] = new_entry
+
+		return path
+
+
+#: The :class:`~.ImageResolver` used to obtain remote images when converting markdown.
+image_resolver = ImageResolver()
 
 
 def img_to_latex(instr: str) -> str:
+	"""
+	Convert an HTML ``img`` tag to LaTeX.
+
+	:param instr:
+	"""
+
 	dom = xml.dom.minidom.parseString(instr)
 	img = dom.documentElement
 	assert img is not None
-	src = img.getAttribute("src")
 
-	if urlparse(src).scheme != '':
-		src_urlparse = urlparse(src)
-		conn = http.client.HTTPConnection(src_urlparse.netloc)
-		conn.request("HEAD", src_urlparse.path)
-		response = conn.getresponse()
-		conn.close()
+	return image_to_latex(img.getAttribute("src"), img.getAttribute("alt"))
+
+
+def image_to_latex(src: str, alt: str = '') -> str:
+	"""
+	Returns a LaTeX figure for the image at ``src``.
+
+	Remote images are downloaded with :py:data:`~.image_resolver`.
 
-		if response.status == 200:
-			filename = os.path.join(tempfile.mkdtemp(), src.split('/')[-1])
-			urllib.request.urlretrieve(src, filename)
-			src = filename
+	:param src: The path or URL of the image.
+	:param alt: The alternative text for the image, which is used as the caption.
+	"""
 
-	alt = img.getAttribute("alt")
+	if urlparse(src).scheme in {"http", "https"}:
+		path = image_resolver.resolve(src)
+		if path is not None:
+			src = path.as_posix()
 
 	# Using graphicx and ajustbox package for *max width*
 
@@ -0,0 +1,377 @@
+#!/usr/bin/env python
+#
+#  includes.py
+"""
+Include directives, for assembling documents from several markdown files.
+
+A line consisting of ``!include`` followed by a path is replaced by the LaTeX for that file:
+
+.. code-block:: markdown
+
+	# Introduction
+
+	!include shared/disclaimer.md
+
+The path is relative to the directory of the including file,
+or to the current working directory for markdown which was not loaded from a file.
+"""
+#
+#  Copyright © 2020-2021 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import hashlib
+import os
+import pathlib
+import re
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+# 3rd party
+import markdown
+import markdown.preprocessors
+
+# this package
+from py2latex.markdown_parser.cache import ConversionCache
+from py2latex.markdown_parser.front_matter import load_front_matter
+from py2latex.markdown_parser.pipeline import LaTeXStash
+from py2latex.markdown_parser.pool import MarkdownPool
+
+__all__ = [
+		"IncludeCycleError",
+		"IncludeGraph",
+		"IncludePreprocessor",
+		"IncludeResolver",
+		"current_file",
+		"has_includes",
+		"include_resolver",
+		"including",
+		]
+
+_include_re = re.compile(r"^!include\s+(?P<path>.+?)\s*$", flags=re.MULTILINE)
+
+_fence_re = re.compile(r"^ {0,3}(`{3,}|~{3,})")
+
+_state = threading.local()
+
+
+def _iter_targets(string: str) -> Iterator[str]:
+	# The paths named in the include directives in ``string``, ignoring any within fenced code blocks.
+
+	fence = None
+
+	for line in string.split('\n'):
+		fence_match = _fence_re.match(line)
+
+		if fence is None:
+			if fence_match:
+				fence = fence_match.group(1)
+			elif line.startswith("!include"):
+				match = _include_re.match(line)
+				if match:
+					yield match.group("path")
+
+		elif fence_match and fence_match.group(1).startswith(fence) and not line[fence_match.end():].strip():
+			fence = None
+
+
+def _stack() -> List[pathlib.Path]:
+	return _state.__dict__.setdefault("stack", [])
+
+
+def current_file() -> Optional[pathlib.Path]:
+	"""
+	Returns the markdown file currently being converted in this thread, if known.
+	"""
+
+	stack = _stack()
+	return stack[-1] if stack else None
+
+
+@contextmanager
+def including(filename: Union[str, pathlib.Path, os.PathLike]) -> Iterator[pathlib.Path]:
+	"""
+	Context manager to mark ``filename`` as the file being converted in this thread,
+	for the duration of the ``with`` block.
+
+	Include directives are resolved relative to this file.
+
+	:param filename:
+	"""
+
+	path = pathlib.Path(filename).resolve()
+	stack = _stack()
+	stack.append(path)
+
+	try:
+		yield path
+	finally:
+		stack.pop()
+
+
+def has_includes(string: str) -> bool:
+	"""
+	Returns whether the given markdown contains any include directives.
+
+	:param string:
+	"""
+
+	return "!include" in string and _include_re.search(string) is not None
+
+
+class IncludeCycleError(ValueError):
+	"""
+	Raised when a markdown file includes itself, directly or indirectly.
+
+	:param cycle: The files in the cycle, starting and ending with the same file.
+	"""
+
+	def __init__(self, cycle: List[pathlib.Path]):
+		self.cycle: List[pathlib.Path] = cycle
+		super().__init__(f"Include cycle detected: {' -> '.join(path.as_posix() for path in cycle)}")
+
+
+class IncludeGraph:
+	"""
+	Records which markdown files include which others.
+	"""
+
+	def __init__(self):
+		self._includes: Dict[pathlib.Path, Set[pathlib.Path]] = {}
+		self._included_by: Dict[pathlib.Path, Set[pathlib.Path]] = {}
+		self._lock = threading.Lock()
+
+	def set_includes(self, path: pathlib.Path, includes: Set[pathlib.Path]) -> None:
+		"""
+		Set the files directly included by ``path``, replacing any recorded previously.
+
+		:param path:
+		:param includes:
+		"""
+
+		with self._lock:
+			for included in self._includes.get(path, set()) - includes:
+				self._included_by[included].discard(path)
+
+			for included in includes:
+				self._included_by.setdefault(included, set()).add(path)
+
+			self._includes[path] = set(includes)
+
+	def includes(self, path: Union[str, pathlib.Path, os.PathLike]) -> Set[pathlib.Path]:
+		"""
+		Returns the files directly included by ``path``.
+
+		:param path:
+		"""
+
+		with self._lock:
+			return set(self._includes.get(pathlib.Path(path).resolve(), ()))
+
+	def dependents(self, path: Union[str, pathlib.Path, os.PathLike]) -> Set[pathlib.Path]:
+		"""
+		Returns the files which include ``path``, directly or indirectly,
+		and which must therefore be converted again if ``path`` changes.
+
+		:param path:
+		"""
+
+		pending = [pathlib.Path(path).resolve()]
+		found: Set[pathlib.Path] = set()
+
+		with self._lock:
+			while pending:
+				for including in self._included_by.get(pending.pop(), ()):
+					if including not in found:
+						found.add(including)
+						pending.append(including)
+
+		return found
+
+
+class IncludeResolver:
+	"""
+	Converts included markdown files, converting each distinct file only once.
+
+	Converted files are cached by a hash of their content, and the content of the files they include in turn,
+	so a file included from many places is converted once,
+	and edits to a file are picked up the next time it is included.
+
+	:param factory: Function which returns a new :class:`markdown.Markdown` instance to convert included files with.
+		Defaults to :func:`~.make_markdown`, with this resolver for nested include directives.
+		A custom factory should pass this resolver to :class:`~.LaTeXExtension`
+		so nested includes share its cache and dependency graph.
+	:param cache: Optional cache of previously converted files, which persists between runs.
+	"""
+
+	def __init__(
+			self,
+			factory: Optional[Callable[[], markdown.Markdown]] = None,
+			cache: Optional[ConversionCache] = None,
+			):
+
+		# Includes may be nested to any depth, so the number of instances is effectively unlimited.
+		self._pool = MarkdownPool(factory or self._make_markdown, maxsize=1 << 16)
+		self.cache: Optional[ConversionCache] = cache
+
+		#: The files included by each file converted so far.
+		self.graph: IncludeGraph = IncludeGraph()
+
+		self._converted: Dict[str, str] = {}
+		self._lock = threading.Lock()
+
+	def _make_markdown(self) -> markdown.Markdown:
+		# Nested includes are resolved by this resolver too, so they share its cache and dependency graph.
+
+		# this package
+		from py2latex.markdown_parser import make_markdown
+
+		return make_markdown(include_resolver=self)
+
+	def resolve_path(self, target: str) -> pathlib.Path:
+		"""
+		Returns the path of the file named in an include directive,
+		relative to the file being converted in this thread.
+
+		:param target:
+		"""
+
+		including_file = current_file()
+
+		if including_file is None:
+			return pathlib.Path(target).resolve()
+		else:
+			return (including_file.parent / target).resolve()
+
+	def _hash(self, path: pathlib.Path, stack: List[pathlib.Path]) -> Tuple[str, str]:
+		# Returns the hash of the file and everything it includes, along with the file's content.
+
+		if path in stack:
+			raise IncludeCycleError([*stack[stack.index(path):], path])
+
+		text = path.read_text()
+		digest = hashlib.sha256(text.encode("UTF-8"))
+		includes = set()
+
+		for target in _iter_targets(text):
+			included = (path.parent / target).resolve()
+			includes.add(included)
+			digest.update(self._hash(included, [*stack, path])[0].encode("UTF-8"))
+
+		self.graph.set_includes(path, includes)
+
+		return digest.hexdigest(), text
+
+	def convert_file(self, path: pathlib.Path) -> str:
+		"""
+		Returns the LaTeX for the given markdown file, converting it if it has not been converted before.
+
+		:param path:
+
+		:raises IncludeCycleError: If the file includes itself, directly or indirectly.
+		"""
+
+		path = path.resolve()
+		key, text = self._hash(path, list(_stack()))
+
+		with self._lock:
+			latex = self._converted.get(key)
+
+		if latex is None and self.cache is not None:
+			latex = self.cache.get(self.cache.key("include", key))
+
+		if latex is None:
+			# The front matter of an included file is ignored.
+			_, text = load_front_matter(text)
+
+			with including(path):
+				latex = self._pool.convert(text)
+
+			if self.cache is not None:
+				self.cache.set(self.cache.key("include", key), latex)
+
+		with self._lock:
+			self._converted[key] = latex
+
+		return latex
+
+	def record(self, path: Union[str, pathlib.Path, os.PathLike], string: str) -> None:
+		"""
+		Record the files included by the markdown in ``string``, which was read from ``path``.
+
+		:param path:
+		:param string:
+		"""
+
+		path = pathlib.Path(path).resolve()
+		includes = {(path.parent / target).resolve() for target in _iter_targets(string)}
+		self.graph.set_includes(path, includes)
+
+
+#: The :class:`~.IncludeResolver` used for include directives unless another is given to :class:`~.LaTeXExtension`.
+include_resolver = IncludeResolver()
+
+
+class IncludePreprocessor(markdown.preprocessors.Preprocessor):
+	"""
+	Markdown preprocessor which replaces include directives with the LaTeX for the included file.
+
+	The LaTeX is kept in the html stash, so it is passed through to the output unchanged.
+
+	:param md:
+	:param resolver: The resolver used to convert included files. Defaults to :py:data:`~.include_resolver`.
+	:param latex_stash: Optional stash to hold the LaTeX until after the block postprocessor has run,
+		as the included LaTeX has already been through it.
+	"""
+
+	def __init__(
+			self,
+			md: Optional[markdown.Markdown] = None,
+			resolver: Optional[IncludeResolver] = None,
+			latex_stash: Optional[LaTeXStash] = None,
+			):
+		super().__init__(md)
+		self.resolver: IncludeResolver = resolver or include_resolver
+		self.latex_stash: Optional[LaTeXStash] = latex_stash
+
+	def run(self, lines: List[str]) -> List[str]:
+		if not any(line.startswith("!include") for line in lines):
+			return lines
+
+		including_file = current_file()
+		if including_file is not None:
+			self.resolver.record(including_file, '\n'.join(lines))
+
+		new_lines = []
+
+		for line in lines:
+			match = _include_re.match(line)
+
+			if match:
+				latex = self.resolver.convert_file(self.resolver.resolve_path(match.group("path")))
+				if self.latex_stash is not None:
+					latex = self.latex_stash.store(latex)
+				new_lines.extend(['', self.md.htmlStash.store(latex), ''])
+			else:
+				new_lines.append(line)
+
+		return new_lines
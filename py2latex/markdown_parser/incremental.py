@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+#
+#  incremental.py
+"""
+Incremental conversion of markdown documents which are edited repeatedly.
+"""
+#
+#  Copyright © 2020 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import hashlib
+import re
+from typing import Callable, Dict, List, Optional
+
+# this package
+from py2latex.markdown_parser.streaming import iter_markdown_blocks
+
+__all__ = ["IncrementalConverter"]
+
+# Reference-style link and footnote definitions, e.g. ``[id]: http://example.com``
+_definition_re = re.compile(r"^ {0,3}\[[^\]]+\]:.*$", flags=re.MULTILINE)
+
+
+def _digest(*parts: str) -> bytes:
+	digest = hashlib.blake2b(digest_size=16)
+
+	for part in parts:
+		digest.update(part.encode("UTF-8"))
+		digest.update(b'\0')
+
+	return digest.digest()
+
+
+class IncrementalConverter:
+	"""
+	Converts a markdown document to LaTeX, reconverting only the blocks which changed since the last conversion.
+
+	The document is split into top-level blocks with :func:`~.iter_markdown_blocks`,
+	which keeps lists, fenced code and maths together.
+	The LaTeX for each block is kept in an index keyed by the hash of the block,
+	so after an edit only the blocks whose hash changed are converted again.
+
+	Reference-style link and footnote definitions may appear anywhere in the document,
+	so they are treated as context shared by every block.
+	Blocks which may use them are converted along with the definitions,
+	and are converted again whenever any definition changes.
+
+	:param convert: Function to convert a block of markdown to LaTeX. Defaults to :func:`~.parse_markdown`.
+
+	.. code-block:: python
+
+		converter = IncrementalConverter()
+		latex = converter.update(text)
+
+		# After an edit to the text:
+		latex = converter.update(text)
+	"""
+
+	#: The blocks of the document from the last call to :meth:`~.IncrementalConverter.update`.
+	blocks: List[str]
+
+	#: The number of blocks converted by the last call to :meth:`~.IncrementalConverter.update`.
+	converted: int
+
+	def __init__(self, convert: Optional[Callable[[str], str]] = None):
+		if convert is None:
+			# this package
+			from py2latex.markdown_parser import parse_markdown
+			convert = parse_markdown
+
+		self.convert: Callable[[str], str] = convert
+		self.blocks = []
+		self.converted = 0
+		self._index: Dict[bytes, str] = {}
+
+	def update(self, text: str) -> str:
+		"""
+		Convert the new version of the document, reusing the LaTeX for blocks which have not changed.
+
+		:param text: The markdown source of the whole document.
+
+		:returns: The LaTeX for the whole document.
+		"""
+
+		blocks = list(iter_markdown_blocks(text.split('\n')))
+		definitions = '\n'.join(_definition_re.findall(text))
+
+		index: Dict[bytes, str] = {}
+		output = []
+		self.converted = 0
+
+		for block in blocks:
+			uses_context = bool(definitions) and '[' in block
+
+			if uses_context:
+				key = _digest(block, definitions)
+			else:
+				key = _digest(block)
+
+			latex = index.get(key)
+			if latex is None:
+				latex = self._index.get(key)
+			if latex is None:
+				self.converted += 1
+				if uses_context:
+					latex = self.convert(f"{block}\n\n{definitions}")
+				else:
+					latex = self.convert(block)
+
+			index[key] = latex
+			output.append(latex)
+
+		# Only keep the blocks in the current version of the document.
+		self._index = index
+		self.blocks = blocks
+
+		return "\n\n".join(output)
+
+	def reset(self) -> None:
+		"""
+		Discard the index of converted blocks, so the next update converts the whole document.
+		"""
+
+		self.blocks = []
+		self.converted = 0
+		self._index = {}
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+#
+#  inline.py
+"""
+Markdown inline patterns for glossary references, citations, superscripts and subscripts.
+"""
+#
+#  Copyright © 2020-2021 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+from typing import Match, Optional, Tuple
+from xml.etree.ElementTree import Element
+
+# 3rd party
+import markdown
+import markdown.inlinepatterns
+
+__all__ = ["CommandInlineProcessor", "register_inline_patterns"]
+
+#: The priority of the patterns, which is above that of markdown's inline html pattern
+#: so ``<sup>`` and ``<sub>`` are not passed through as raw html.
+PRIORITY = 95
+
+
+class CommandInlineProcessor(markdown.inlinepatterns.InlineProcessor):
+	"""
+	Inline processor for text such as ``gls{key}``,
+	which is converted to a LaTeX command taking the key as its argument.
+
+	The match is replaced by an element with the name of the command as its tag,
+	and with the argument in its ``key`` attribute.
+
+	:param pattern: The regular expression, whose first group is the argument.
+	:param command: The name of the LaTeX command.
+	:param md:
+	"""
+
+	def __init__(self, pattern: str, command: str, md: Optional[markdown.Markdown] = None):
+		super().__init__(pattern, md)
+		self.command = command
+
+	def handleMatch(self, m: Match[str], data: str) -> Tuple[Element, int, int]:  # type: ignore[override]
+		el = Element(self.command)
+		el.set("key", m.group(1))
+		return el, m.start(0), m.end(0)
+
+
+class _TextTagInlineProcessor(markdown.inlinepatterns.InlineProcessor):
+	# Replaces the match with an element with the given tag, whose content is the first group of the match.
+
+	def __init__(self, pattern: str, tag: str, md: Optional[markdown.Markdown] = None):
+		super().__init__(pattern, md)
+		self.tag = tag
+
+	def handleMatch(self, m: Match[str], data: str) -> Tuple[Element, int, int]:  # type: ignore[override]
+		el = Element(self.tag)
+		el.text = m.group(1)
+		return el, m.start(0), m.end(0)
+
+
+def register_inline_patterns(md: markdown.Markdown) -> None:
+	"""
+	Register the inline patterns for glossary references, citations, superscripts and subscripts with ``md``.
+
+	The elements they produce are converted to LaTeX by the ``gls``, ``cite``, ``citep``,
+	``textsuperscript`` and ``textsubscript`` tag handlers.
+
+	:param md:
+	"""
+
+	patterns = md.inlinePatterns
+	patterns.register(CommandInlineProcessor(r"(?<!\\)gls{([^}]*)}", "gls", md), "latex_gls", PRIORITY)
+	patterns.register(CommandInlineProcessor(r"(?<!\\)citep{([^}]*)}", "citep", md), "latex_citep", PRIORITY)
+	patterns.register(CommandInlineProcessor(r"(?<!\\)cite{([^}]*)}", "cite", md), "latex_cite", PRIORITY)
+	patterns.register(_TextTagInlineProcessor(r"<sup>(.+?)</sup>", "textsuperscript", md), "latex_sup", PRIORITY)
+	patterns.register(_TextTagInlineProcessor(r"<sub>(.+?)</sub>", "textsubscript", md), "latex_sub", PRIORITY)
@@ -30,14 +30,18 @@
 #
 
 # stdlib
+import html
 import re
-import xml.dom.minidom
-from typing import List
+from typing import Match, Optional
 
 # 3rd party
 import markdown.postprocessors
+import markdown.util
 
-__all__ = ["link_to_Latex", "LinkTextPostProcessor"]
+# this package
+from py2latex.markdown_parser.utils import escape_latex_entities
+
+__all__ = ["LinkTextPostProcessor", "convert_link_block", "escape_url", "link_to_Latex", "link_to_latex"]
 
 
 class LinkTextPostProcessor(markdown.postprocessors.Postprocessor):
@@ -52,36 +56,103 @@ class LinkTextPostProcessor(markdown.postprocessors.Postprocessor):
 		:param text:
 		"""
 
-		# Process all hyperlinks
+		return convert_link_block(text)
+
+
+def convert_link_block(block: str) -> str:
+	"""
+	Convert all hyperlinks in the given block to LaTeX.
+
+	:param block:
+	"""
+
+	if "<a" not in block:
+		return block
+
+	return _link_re.sub(_convert_link, block)
+
+
+_link_re = re.compile(r"<a\s(?P<attributes>[^>]*)>(?P<text>.*?)</a>", flags=re.DOTALL)
+_href_re = re.compile(r"""\bhref\s*=\s*(?:"(?P<double>[^"]*)"|'(?P<single>[^']*)')""")
+_tag_re = re.compile(r"<[^>]*>")
+
+
+def _convert_link(match: Match[str]) -> str:
+	href_match = _href_re.search(match.group("attributes"))
+
+	if href_match is None:
+		return match.group("text")
+
+	href = html.unescape(href_match.group("double") or href_match.group("single") or '')
+	text = match.group("text")
+
+	return link_to_latex(href, text, _tag_re.sub('', text))
+
+
+# Characters which are percent-encoded in URLs, as they cannot be escaped in the argument to \href.
+_url_quote_table = str.maketrans({'\\': "%5C", '{': "%7B", '}': "%7D", ' ': "%20"})
+
+# Characters which must be escaped with a backslash.
+_url_escape_re = re.compile(r"[%#]")
 
-		new_blocks: List[str] = []
 
-		for block in text.split("\n\n"):
-			stripped = block.strip()
-			match = re.search(r"<a[^>]*>([^<]+)</a>", stripped)
-			# <table catches modified versions (e.g. <table class="..">
+def escape_url(url: str) -> str:
+	"""
+	Escape the given URL for use in the argument to ``\\href`` or ``\\url``.
+
+	:param url:
+	"""
+
+	return _url_escape_re.sub(r"\\\g<0>", url.translate(_url_quote_table))
+
+
+def _decode_obfuscated(text: str) -> str:
+	# Python-Markdown obfuscates email addresses as html entities,
+	# with the ampersands replaced by a placeholder until the html is serialised.
+
+	if markdown.util.AMP_SUBSTITUTE not in text:
+		return text
+
+	return html.unescape(text.replace(markdown.util.AMP_SUBSTITUTE, '&'))
+
 
-			if match:
-				latex_link = re.sub(r"<a[^>]*>([^<]+)</a>", link_to_Latex(match.group(0)).strip(), stripped)
-				new_blocks.append(latex_link)
-			else:
-				new_blocks.append(block)
+def link_to_latex(href: str, text: str, plain_text: Optional[str] = None) -> str:
+	"""
+	Returns the LaTeX for a hyperlink.
+
+	Links whose text is the URL itself, such as markdown's ``<http://example.com>`` autolinks,
+	are converted to ``\\url``. Other links, including email addresses, are converted to ``\\href``.
+
+	:param href: The target of the link.
+	:param text: The LaTeX for the text of the link.
+	:param plain_text: The text of the link without any markup, used to detect autolinks. Defaults to ``text``.
+	"""
+
+	if plain_text is None:
+		plain_text = text
 
-		return "\n\n".join(new_blocks)
+	href = _decode_obfuscated(href)
+
+	if markdown.util.AMP_SUBSTITUTE in text:
+		plain_text = _decode_obfuscated(plain_text)
+		text = escape_latex_entities(plain_text)
+
+	if plain_text.strip() == href:
+		return f"\\url{{{escape_url(href)}}}"
+	else:
+		return f"\\href{{{escape_url(href)}}}{{{text}}}"
 
 
 def link_to_Latex(link_str: str) -> str:
 	"""
 	Convert an HTML link to its latex equivalent.
+
+	:param link_str: The HTML for a single link.
 	"""
 
-	dom = xml.dom.minidom.parseString(link_str)
-	link = dom.documentElement
-	assert link is not None
-	href = link.getAttribute("href")
+	match = _link_re.search(link_str)
 
-	desc = re.search(r">([^<]+)", link_str)
-	if desc:
-		return f"\n\\href{{{href}}}{{{desc.group(0)[1:]}}}\n"
+	if match:
+		return f"\n{_convert_link(match)}\n"
 	else:
 		return ''
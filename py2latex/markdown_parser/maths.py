@@ -31,14 +31,17 @@
 
 # stdlib
 import re
+from itertools import groupby
+from typing import Iterator, List, Match, Optional, Sequence
 
 # 3rd party
 import markdown.postprocessors
+import markdown.preprocessors
 
 # this package
 from py2latex.markdown_parser.utils import unescape_latex_entities
 
-__all__ = ["MathTextPostProcessor"]
+__all__ = ["MathTextPostProcessor", "MathsPostprocessor", "MathsPreprocessor", "convert_maths"]
 
 
 class MathTextPostProcessor(markdown.postprocessors.Postprocessor):
@@ -51,39 +54,203 @@ class MathTextPostProcessor(markdown.postprocessors.Postprocessor):
 		(*not* the standard asciimathml or latexmathml delimiter).
 		"""
 
-		def repl_1(matchobj) -> str:
-			"""
+		return convert_maths(instr)
 
-			:param matchobj:
-			:type matchobj:
 
-			:return:
-			:rtype: str
-			"""
+def _block_maths(matchobj) -> str:
+	text = unescape_latex_entities(matchobj.group(1))
+	return f"\\[{text}\\]"
 
-			text = unescape_latex_entities(matchobj.group(1))
-			return f"\\[{text}\\]"
 
-		def repl_2(matchobj) -> str:
-			"""
+def _inline_maths(matchobj) -> str:
+	text = unescape_latex_entities(matchobj.group(1))
+	return f"\\({text}\\)"
 
-			:param matchobj:
-			"""
 
-			text = unescape_latex_entities(matchobj.group(1))
-			return f"\\({text}\\)"
+# This $$x=3$$ is block math
+_block_maths_re = re.compile(r"\$\$([^$]*)\$\$")
 
-		# This $$x=3$$ is block math
-		pat = re.compile(r"\$\$([^$]*)\$\$")
-		out = pat.sub(repl_1, instr)
+# This $x=3$ is inline math
+_inline_maths_re = re.compile(r"\$([^$]*)\$")
 
-		# This $x=3$ is inline math
-		pat2 = re.compile(r"\$([^$]*)\$")
-		out = pat2.sub(repl_2, out)
 
-		# some extras due to asciimathml
-		out = out.replace("\\lt", '<')
-		out = out.replace(" * ", " \\cdot ")
-		out = out.replace("\\del", "\\partial")
+def convert_maths(text: str) -> str:
+	"""
+	Convert all math sections in ``text`` to LaTeX.
 
-		return out
+	:param text:
+	"""
+
+	if '$' in text:
+		text = _block_maths_re.sub(_block_maths, text)
+		text = _inline_maths_re.sub(_inline_maths, text)
+
+	return _asciimath_extras(text)
+
+
+def _asciimath_extras(text: str) -> str:
+	# some extras due to asciimathml
+	text = text.replace("\\lt", '<')
+	text = text.replace(" * ", " \\cdot ")
+	text = text.replace("\\del", "\\partial")
+
+	return text
+
+
+# Maths spans, and the parts of the source which may contain dollar signs that do not delimit maths.
+_maths_span_re = re.compile(
+		r"""
+		(?P<escaped>\\\$)
+		|(?P<code>(?P<backticks>`+).+?(?P=backticks))
+		|\$\$(?P<block>.+?)\$\$
+		|\$(?P<inline>[^$]+?)\$
+		""",
+		flags=re.VERBOSE | re.DOTALL,
+		)
+
+_fence_re = re.compile(r"^ {0,3}(`{3,}|~{3,})")
+_indented_code_re = re.compile(r"^(?: {4}|\t)")
+_list_item_re = re.compile(r"^ {0,3}(?:[*+-]|[0-9]+[.)])(?:[ \t]|$)")
+
+_maths_placeholder = "\x02py2latexmath{}\x03"
+_maths_placeholder_re = re.compile("\x02py2latexmath([0-9]+)\x03")
+
+
+def _iter_code_lines(lines: Sequence[str]) -> Iterator[bool]:
+	# Whether each line is part of a fenced or indented code block.
+	# Indented lines within a list are the content of the list item, rather than code.
+
+	fence: Optional[str] = None
+	indented = False
+	in_list = False
+	after_blank = True
+
+	for line in lines:
+		if fence is not None:
+			match = _fence_re.match(line)
+			if match and match.group(1).startswith(fence) and not line[match.end():].strip():
+				fence = None
+			yield True
+			continue
+
+		if not line.strip():
+			after_blank = True
+			yield indented
+			continue
+
+		if (indented or after_blank) and not in_list and _indented_code_re.match(line):
+			indented = True
+		else:
+			indented = False
+			match = _fence_re.match(line)
+
+			if match:
+				fence = match.group(1)
+			elif _list_item_re.match(line):
+				in_list = True
+			elif after_blank and not _indented_code_re.match(line):
+				in_list = False
+
+		after_blank = False
+		yield indented or fence is not None
+
+
+class MathsPreprocessor(markdown.preprocessors.Preprocessor):
+	"""
+	Markdown preprocessor which replaces maths with placeholders before the markdown is parsed.
+
+	This assumes you are using ``$`` for inline maths and ``$$`` for blocks as your mathematics delimiter.
+	Dollar signs escaped with a backslash, and those in inline code or in fenced or indented code blocks,
+	are left alone.
+
+	The maths is converted to LaTeX once, and is restored verbatim by :class:`~.MathsPostprocessor`,
+	so it is not affected by the markdown syntax or by escaping LaTeX entities in the rest of the document.
+
+	:param md:
+	"""
+
+	#: The LaTeX for each placeholder in the current document.
+	stash: List[str]
+
+	#: The markdown source for each placeholder in the current document.
+	sources: List[str]
+
+	def __init__(self, md: Optional[markdown.Markdown] = None):
+		super().__init__(md)
+		self.stash = []
+		self.sources = []
+
+	def run(self, lines: List[str]) -> List[str]:
+		self.stash.clear()
+		self.sources.clear()
+
+		if not any('$' in line for line in lines):
+			return lines
+
+		new_lines = []
+
+		for is_code, group in groupby(zip(_iter_code_lines(lines), lines), key=lambda pair: pair[0]):
+			group_lines = [line for _, line in group]
+
+			if is_code:
+				new_lines.extend(group_lines)
+			else:
+				new_lines.extend(_maths_span_re.sub(self._store, '\n'.join(group_lines)).split('\n'))
+
+		return new_lines
+
+	def _store(self, match: Match[str]) -> str:
+		kind = match.lastgroup
+
+		if kind == "block":
+			latex = f"\\[{_asciimath_extras(match.group(kind))}\\]"
+		elif kind == "inline":
+			latex = f"\\({_asciimath_extras(match.group(kind))}\\)"
+		elif kind == "escaped":
+			# Stashed so the backslash is kept whichever parser is used, as CommonMark removes it.
+			latex = match.group()
+		else:
+			return match.group()
+
+		self.stash.append(latex)
+		self.sources.append(match.group())
+		return _maths_placeholder.format(len(self.stash) - 1)
+
+	def restore_source(self, text: str) -> str:
+		"""
+		Replace the placeholders in ``text`` with the markdown source of the maths they replaced.
+
+		This is used for code, which should be output verbatim rather than as maths.
+
+		:param text:
+		"""
+
+		if not self.sources:
+			return text
+
+		return _maths_placeholder_re.sub(lambda match: self.sources[int(match.group(1))], text)
+
+
+class MathsPostprocessor(markdown.postprocessors.Postprocessor):
+	"""
+	Markdown postprocessor which restores the maths replaced by a :class:`~.MathsPreprocessor`.
+
+	:param md:
+	:param preprocessor: The preprocessor which replaced the maths.
+	"""
+
+	def __init__(self, md: Optional[markdown.Markdown] = None, preprocessor: Optional[MathsPreprocessor] = None):
+		super().__init__(md)
+
+		if preprocessor is None:
+			preprocessor = MathsPreprocessor(md)
+
+		self.preprocessor: MathsPreprocessor = preprocessor
+
+	def run(self, text: str) -> str:
+		stash = self.preprocessor.stash
+
+		if not stash:
+			return text
+
+		return _maths_placeholder_re.sub(lambda match: stash[int(match.group(1))], text)
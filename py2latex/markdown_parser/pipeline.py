@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+#
+#  pipeline.py
+"""
+Single-pass postprocessing of the LaTeX produced from markdown.
+"""
+#
+#  Copyright © 2020-2021 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+#  Parts based on https://github.com/rufuspollock/markdown2latex
+#  BSD Licensed
+#  Authored by Rufus Pollock: <http://www.rufuspollock.org/>
+#  Reworked by Julian Wulfheide (ju.wulfheide@gmail.com) and
+#  Pedro Gaudencio (pmgaudencio@gmail.com)
+#
+# stdlib
+import re
+from typing import Callable, Iterable, List, Optional, Union
+
+# 3rd party
+import markdown
+import markdown.postprocessors
+import markdown.preprocessors
+
+# this package
+from py2latex.markdown_parser.images import convert_image_block
+from py2latex.markdown_parser.links import convert_link_block
+from py2latex.markdown_parser.maths import _iter_code_lines
+from py2latex.markdown_parser.tables import BooktabsTable, Table2Latex, convert_table_block
+from py2latex.markdown_parser.utils import unescape_html_entities
+
+__all__ = [
+		"BlockConverter",
+		"BlockPostProcessor",
+		"CommentPreprocessor",
+		"LaTeXStash",
+		"LaTeXStashPostprocessor",
+		]
+
+#: Type hint for a function which converts a block of text.
+BlockConverter = Callable[[str], str]
+
+_latex_placeholder = "\x02py2latexraw{}\x03"
+_latex_placeholder_re = re.compile("\x02py2latexraw([0-9]+)\x03")
+
+
+class BlockPostProcessor(markdown.postprocessors.Postprocessor):
+	"""
+	Markdown postprocessor which converts the document in a single pass over its blocks.
+
+	The document is split into blocks on blank lines once,
+	and each block is passed through each of the converters in turn.
+	This replaces separate postprocessors for images, tables and links,
+	each of which would otherwise split and rejoin the whole document.
+
+	:param md:
+	:param converters: The functions to convert each block with, in order.
+		If not given, :meth:`~.BlockPostProcessor.default_converters` is used.
+	:param table_converter: The converter for html tables, used by the default converters.
+		Defaults to a new :class:`~.Table2Latex`.
+	"""
+
+	#: The functions each block is converted with, in order.
+	converters: List[BlockConverter]
+
+	def __init__(
+			self,
+			md: Optional[markdown.Markdown] = None,
+			converters: Optional[Iterable[BlockConverter]] = None,
+			table_converter: Union[Table2Latex, BooktabsTable, None] = None,
+			):
+		super().__init__(md)
+
+		if converters is None:
+			self.converters = self.default_converters(table_converter)
+		else:
+			self.converters = list(converters)
+
+	@staticmethod
+	def default_converters(table_converter: Union[Table2Latex, BooktabsTable, None] = None) -> List[BlockConverter]:
+		"""
+		Returns the default converters for blocks.
+
+		:param table_converter: The converter for html tables. Defaults to a new :class:`~.Table2Latex`.
+		"""
+
+		if table_converter is None:
+			table_converter = Table2Latex()
+
+		return [
+				unescape_html_entities,
+				convert_image_block,
+				lambda block: convert_table_block(block, table_converter),
+				convert_link_block,
+				]
+
+	def run(self, text: str) -> str:
+		"""
+		Convert each block of the document.
+
+		:param text:
+		"""
+
+		# The tree processor wraps the whole document in a single root element.
+		if text.startswith("<root>") and text.endswith("</root>"):
+			text = text[6:-7]
+
+		return "\n\n".join([self.convert_block(block) for block in text.split("\n\n")])
+
+	def convert_block(self, block: str) -> str:
+		"""
+		Pass a single block through each of the converters.
+
+		:param block:
+		"""
+
+		for converter in self.converters:
+			block = converter(block)
+
+		return block
+
+
+class LaTeXStash:
+	"""
+	Holds finished LaTeX, such as code blocks, which must not be altered by the :class:`~.BlockPostProcessor`.
+
+	Each piece of LaTeX is replaced by a placeholder until :meth:`~.LaTeXStash.restore` is called.
+	"""
+
+	def __init__(self):
+		self.blocks: List[str] = []
+
+	def store(self, latex: str) -> str:
+		"""
+		Store the given LaTeX, and return the placeholder to put in the document instead.
+
+		:param latex:
+		"""
+
+		self.blocks.append(latex)
+		return _latex_placeholder.format(len(self.blocks) - 1)
+
+	def restore(self, text: str) -> str:
+		"""
+		Replace the placeholders in ``text`` with the stored LaTeX, and empty the stash.
+
+		:param text:
+		"""
+
+		blocks = self.blocks
+
+		if not blocks:
+			return text
+
+		self.blocks = []
+		return _latex_placeholder_re.sub(lambda match: blocks[int(match.group(1))], text)
+
+
+class CommentPreprocessor(markdown.preprocessors.Preprocessor):
+	"""
+	Markdown preprocessor which keeps lines starting with ``%`` as LaTeX comments.
+
+	Each comment line is held in a :class:`~.LaTeXStash`, so it is not escaped along with the rest of the text.
+	A ``%`` anywhere else, or in a code block, is not a comment and is escaped as usual.
+
+	:param md:
+	:param latex_stash:
+	"""
+
+	def __init__(self, md: Optional[markdown.Markdown] = None, latex_stash: Optional[LaTeXStash] = None):
+		super().__init__(md)
+		self.latex_stash: LaTeXStash = latex_stash or LaTeXStash()
+
+	def run(self, lines: List[str]) -> List[str]:
+		if not any(line.startswith('%') for line in lines):
+			return lines
+
+		return [
+				self.latex_stash.store(line) if line.startswith('%') and not is_code else line
+				for is_code, line in zip(_iter_code_lines(lines), lines)
+				]
+
+
+class LaTeXStashPostprocessor(markdown.postprocessors.Postprocessor):
+	"""
+	Markdown postprocessor which restores the LaTeX held in a :class:`~.LaTeXStash`.
+
+	It runs after the :class:`~.BlockPostProcessor`.
+
+	:param md:
+	:param stash:
+	"""
+
+	def __init__(self, md: Optional[markdown.Markdown] = None, stash: Optional[LaTeXStash] = None):
+		super().__init__(md)
+		self.stash: LaTeXStash = stash or LaTeXStash()
+
+	def run(self, text: str) -> str:
+		return self.stash.restore(text)
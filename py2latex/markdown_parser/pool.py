@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+#
+#  pool.py
+"""
+Thread-safe pool of :class:`markdown.Markdown` instances.
+"""
+#
+#  Copyright © 2020 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+# 3rd party
+import markdown
+
+__all__ = ["MarkdownPool"]
+
+
+class MarkdownPool:
+	"""
+	A bounded pool of configured :class:`markdown.Markdown` instances.
+
+	A :class:`markdown.Markdown` instance holds state for the document being converted,
+	so may only be used by one thread at a time.
+	The pool hands each caller an instance of its own, creating new instances on demand up to ``maxsize``,
+	after which callers wait for an instance to be returned.
+	Instances are reset before being returned to the pool.
+
+	:param factory: Function which returns a new, configured, :class:`markdown.Markdown` instance.
+	:param maxsize: The maximum number of instances. Defaults to the number of CPUs.
+	"""
+
+	def __init__(self, factory: Callable[[], markdown.Markdown], maxsize: Optional[int] = None):
+		if maxsize is None:
+			maxsize = os.cpu_count() or 4
+		elif maxsize < 1:
+			raise ValueError("'maxsize' must be at least 1.")
+
+		self.factory: Callable[[], markdown.Markdown] = factory
+		self.maxsize: int = maxsize
+
+		self._idle: "queue.LifoQueue[markdown.Markdown]" = queue.LifoQueue()
+		self._created = 0
+		self._lock = threading.Lock()
+
+	@contextmanager
+	def acquire(self) -> Iterator[markdown.Markdown]:
+		"""
+		Context manager which takes an instance from the pool for the duration of the ``with`` block.
+		"""
+
+		instance = self._take()
+
+		try:
+			yield instance
+		finally:
+			instance.reset()
+			self._idle.put(instance)
+
+	def _take(self) -> markdown.Markdown:
+		try:
+			return self._idle.get_nowait()
+		except queue.Empty:
+			pass
+
+		with self._lock:
+			create = self._created < self.maxsize
+			if create:
+				self._created += 1
+
+		if create:
+			try:
+				return self.factory()
+			except BaseException:
+				with self._lock:
+					self._created -= 1
+				raise
+
+		return self._idle.get()
+
+	def convert(self, string: str) -> str:
+		"""
+		Convert the given markdown source using an instance from the pool.
+
+		:param string:
+		"""
+
+		with self.acquire() as instance:
+			return instance.convert(string)
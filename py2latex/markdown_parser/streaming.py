@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+#
+#  streaming.py
+"""
+Split markdown into blocks and sections which can be converted independently.
+"""
+#
+#  Copyright © 2020 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import re
+from typing import Iterable, Iterator, List, Optional
+
+__all__ = ["is_heading", "iter_markdown_blocks", "iter_markdown_sections"]
+
+_fence_re = re.compile(r"^ {0,3}(`{3,}|~{3,})")
+_list_item_re = re.compile(r"^ {0,3}(?:[*+-]|[0-9]+[.)])\s")
+_atx_heading_re = re.compile(r"^ {0,3}#{1,6}(?:\s|$)")
+_setext_underline_re = re.compile(r"^ {0,3}(?:=+|-+)\s*$")
+
+
+def is_heading(block: str) -> bool:
+	"""
+	Returns whether the given block of markdown starts with a heading.
+
+	:param block:
+	"""
+
+	if _atx_heading_re.match(block):
+		return True
+
+	lines = block.split('\n', 2)
+	return len(lines) > 1 and bool(_setext_underline_re.match(lines[1]))
+
+
+def _is_boundary(block: List[str], line: str) -> bool:
+	# Whether the blank lines before ``line`` end ``block``.
+
+	if line[:1] in {' ', '\t'}:
+		# Continuation of a list item, or an indented code block.
+		return False
+	elif _list_item_re.match(line) and _list_item_re.match(block[0]):
+		# The next item in a loose list.
+		return False
+	else:
+		return True
+
+
+def iter_markdown_blocks(lines: Iterable[str]) -> Iterator[str]:
+	"""
+	Split markdown into top-level blocks, separated by blank lines.
+
+	Blank lines only end a block where doing so does not change how the markdown is parsed.
+	Fenced code blocks and ``$$`` maths are never split,
+	and neither are lists or anything else continued by indented lines.
+
+	The lines are consumed lazily, so an open file may be passed to split it without reading it all into memory.
+
+	.. note::
+
+		Reference-style links must be defined in the same block as they are used
+		for the blocks to be converted independently.
+
+	:param lines: The lines of the markdown, with or without line endings.
+	"""
+
+	block: List[str] = []
+	blank_lines = 0
+	fence: Optional[str] = None
+	in_maths = False
+
+	for line in lines:
+		line = line.rstrip("\r\n")
+
+		if fence is None and not in_maths:
+			if not line.strip():
+				blank_lines += 1
+				continue
+
+			if block and blank_lines:
+				if _is_boundary(block, line):
+					yield '\n'.join(block)
+					block = []
+				else:
+					block.extend([''] * blank_lines)
+
+			blank_lines = 0
+
+			fence_match = _fence_re.match(line)
+			if fence_match:
+				fence = fence_match.group(1)
+			elif line.count("$$") % 2:
+				in_maths = True
+
+		elif fence is not None:
+			if line.strip().startswith(fence) and not line.strip().strip(fence[0]):
+				fence = None
+
+		elif line.count("$$") % 2:
+			in_maths = False
+
+		block.append(line)
+
+	if block:
+		yield '\n'.join(block)
+
+
+def iter_markdown_sections(lines: Iterable[str], max_size: int = 1 << 20) -> Iterator[str]:
+	"""
+	Split markdown into sections which can be converted independently.
+
+	A new section is started at each heading, or at the next block boundary once the section reaches ``max_size``.
+	Memory use is therefore bounded by the size of the largest section,
+	rather than the size of the whole document.
+
+	:param lines: The lines of the markdown, with or without line endings.
+	:param max_size: The size, in characters, after which a section is ended at the next block boundary
+		even if no heading has been reached.
+	"""
+
+	section: List[str] = []
+	size = 0
+
+	for block in iter_markdown_blocks(lines):
+		if section and (size >= max_size or is_heading(block)):
+			yield "\n\n".join(section)
+			section = []
+			size = 0
+
+		section.append(block)
+		size += len(block)
+
+	if section:
+		yield "\n\n".join(section)
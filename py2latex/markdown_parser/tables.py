@@ -30,16 +30,19 @@
 #
 
 # stdlib
-import xml.dom.minidom
-from typing import List
+import re
+from typing import Callable, Iterator, List, Optional, Tuple, Union
+from xml.etree import ElementTree
+from xml.etree.ElementTree import Element
 
 # 3rd party
 import markdown.postprocessors
 
 # this package
 from py2latex.markdown_parser.utils import escape_latex_entities
+from py2latex.tables import longtable_from_template, table_from_template, tabular_from_template
 
-__all__ = ["Table2Latex", "TableTextPostProcessor"]
+__all__ = ["BooktabsTable", "Table2Latex", "TableTextPostProcessor", "convert_table_block"]
 
 
 class TableTextPostProcessor(markdown.postprocessors.Postprocessor):
@@ -54,118 +57,172 @@ class TableTextPostProcessor(markdown.postprocessors.Postprocessor):
 		"""  # noqa: D400
 
 		converter = Table2Latex()
-		new_blocks: List[str] = []
-
-		for block in instr.split("\n\n"):
-			stripped = block.strip()
-			# <table catches modified verions (e.g. <table class="..">
-			if stripped.startswith("<table") and stripped.endswith("</table>"):
-				latex_table = converter.convert(stripped).strip()
-				new_blocks.append(latex_table)
-			else:
-				new_blocks.append(block)
-		return "\n\n".join(new_blocks)
+		return "\n\n".join([convert_table_block(block, converter) for block in instr.split("\n\n")])
+
+
+def convert_table_block(block: str, converter: Union["Table2Latex", "BooktabsTable", None] = None) -> str:
+	"""
+	Convert the given block to LaTeX, if the block consists of an HTML table.
+
+	:param block:
+	:param converter: The converter to use, either a :class:`~.Table2Latex` or a :class:`~.BooktabsTable`.
+		A new :class:`~.Table2Latex` is created if not given.
+	"""
+
+	stripped = block.strip()
+
+	# <table catches modified verions (e.g. <table class="..">
+	if stripped.startswith("<table") and stripped.endswith("</table>"):
+		if converter is None:
+			converter = Table2Latex()
+		return converter.convert(stripped).strip()
+	else:
+		return block
+
+
+def _element_text(element: Element) -> str:
+	return escape_latex_entities(''.join(element.itertext()))
+
+
+def _iter_rows(table: Element) -> Iterator[Element]:
+	# The rows of the table itself, excluding those of any nested tables.
+	for child in table:
+		if child.tag == "tr":
+			yield child
+		elif child.tag in {"thead", "tbody", "tfoot"}:
+			yield from (row for row in child if row.tag == "tr")
+
+
+def _span(cell: Element, attribute: str) -> int:
+	try:
+		return max(int(cell.get(attribute, 1)), 1)
+	except ValueError:
+		return 1
+
+
+def _rule(occupied: List[int]) -> str:
+	# The rule above a row, which must not cross cells spanning down from the previous rows.
+
+	if not any(occupied):
+		return "\\hline"
+
+	rules = []
+	start = None
+
+	for column, remaining in enumerate([*occupied, 1]):
+		if not remaining and start is None:
+			start = column
+		elif remaining and start is not None:
+			rules.append(f"\\cline{{{start + 1}-{column}}}")
+			start = None
+
+	return ''.join(rules)
 
 
 class Table2Latex:
 	"""
 	Convert html tables to Latex.
 
-	.. TODO:: escape latex entities.
+	Each row is converted in a single pass.
+	A grid of the columns occupied by cells spanning multiple rows is kept as the table is converted,
+	so cells with ``rowspan`` can be converted to ``\\multirow``, which requires the ``multirow`` package.
 	"""
 
 	numcols: int
 	maxcols: int
 
-	def colformat(self):
+	def colformat(self) -> str:
 		# centre align everything by default
 		out = "|l" * self.maxcols + '|'
 		return out
 
-	def get_text(self, element):
-		if element.nodeType == element.TEXT_NODE:
-			return escape_latex_entities(element.data)
-		result = ''
-		if element.childNodes:
-			for child in element.childNodes:
-				text = self.get_text(child)
-				if text.strip() != '':
-					result += text
-		return result
-
-	def process_cell(self, element):
-		# works on both td and th
-		colspan = 1
-		subcontent = self.get_text(element)
-		buffer = ''
-
-		if element.tagName == "th":
-			subcontent = f"\\textbf{{{subcontent}}}"
-		if element.hasAttribute("colspan"):
-			colspan = int(element.getAttribute("colspan"))
-			buffer += fr" \multicolumn{{{colspan}}}{{|c|}}{{{subcontent}}}"
-		# we don't support rowspan because:
-		#   1. it needs an extra latex package \usepackage{multirow}
-		#   2. it requires us to mess around with the alignment tags in
-		#   subsequent rows (i.e. suppose the first col in row A is rowspan 2
-		#   then in row B in the latex we will need a leading &)
-		# if element.hasAttribute("rowspan"):
-		#     rowspan = int(element.getAttribute("rowspan"))
-		#     buffer += " \multirow{%s}{|c|}{%s}" % (rowspan, subcontent)
-		else:
-			buffer += f" {subcontent}"
+	def convert_element(self, table: Element, render: Optional[Callable[[Element], str]] = None) -> str:
+		"""
+		Convert a table in an :class:`~xml.etree.ElementTree.Element` tree to LaTeX.
 
-		notLast = (
-				element.nextSibling.nextSibling
-				and element.nextSibling.nextSibling.nodeType == element.ELEMENT_NODE
-				and element.nextSibling.nextSibling.tagName in ["td", "th"]
-				)
+		:param table: The ``table`` element.
+		:param render: Function which returns the LaTeX for the content of a cell.
+			By default the cell's text is escaped and any markup is discarded.
+		"""
+
+		if render is None:
+			render = _element_text
+
+		self.numcols = 0
+		self.maxcols = 0
+		rows = []
+
+		# The number of further rows covered by a cell spanning down into each column,
+		# and the number of columns spanned by that cell, given at the first column it spans.
+		occupied: List[int] = []
+		widths: List[int] = []
+
+		for row in _iter_rows(table):
+			rule = _rule(occupied)
+			row_cells: List[str] = []
+			column = 0
+
+			for cell in row:
+				if cell.tag not in {"td", "th"}:
+					continue
+
+				column = self._skip_occupied(occupied, widths, column, row_cells)
+
+				content = render(cell)
+				if cell.tag == "th":
+					content = f"\\textbf{{{content}}}"
 
-		if notLast:
-			buffer += " &"
+				colspan = _span(cell, "colspan")
+				rowspan = _span(cell, "rowspan")
 
-		self.numcols += colspan
-		return buffer
+				if rowspan > 1:
+					content = f"\\multirow{{{rowspan}}}{{*}}{{{content}}}"
 
-	def tolatex(self, element):
-		if element.nodeType == element.TEXT_NODE:
-			return ''
+				if "colspan" in cell.attrib:
+					row_cells.append(f"\\multicolumn{{{colspan}}}{{|c|}}{{{content}}}")
+				else:
+					row_cells.append(content)
 
-		buffer = ''
-		subcontent = ''
-		if element.childNodes:
-			for child in element.childNodes:
-				text = self.tolatex(child)
-				if text.strip() != '':
-					subcontent += text
-		subcontent = subcontent.strip()
+				if len(occupied) < column + colspan:
+					occupied.extend([0] * (column + colspan - len(occupied)))
+					widths.extend([0] * (column + colspan - len(widths)))
 
-		if element.tagName == "thead":
-			buffer += subcontent
+				occupied[column:column + colspan] = [rowspan] * colspan
+				widths[column:column + colspan] = [colspan] + [0] * (colspan - 1)
 
-		elif element.tagName == "tr":
+				column += colspan
+
+			column = self._skip_occupied(occupied, widths, column, row_cells)
+
+			self.numcols = column
 			self.maxcols = max(self.numcols, self.maxcols)
-			self.numcols = 0
-			buffer += f"\n\\hline\n{subcontent} \\\\"
+			rows.append(f"\n{rule}\n{' & '.join(row_cells)} \\\\")
 
-		elif element.tagName == "td" or element.tagName == "th":
-			buffer = self.process_cell(element)
-		else:
-			buffer += subcontent
-		return buffer
+			# Move on to the next row.
+			occupied = [remaining - 1 if remaining else 0 for remaining in occupied]
 
-	def convert(self, instr):
-		self.numcols = 0
-		self.maxcols = 0
-		dom = xml.dom.minidom.parseString(instr)
-		core = self.tolatex(dom.documentElement)
+		caption_element = table.find("caption")
+		caption = '' if caption_element is None else render(caption_element)
+
+		return self._make_table(''.join(rows), caption)
+
+	@staticmethod
+	def _skip_occupied(occupied: List[int], widths: List[int], column: int, row_cells: List[str]) -> int:
+		# Add empty cells for the columns covered by cells from previous rows, starting at ``column``.
+
+		while column < len(occupied) and occupied[column]:
+			width = widths[column] or 1
+
+			if width > 1:
+				row_cells.append(f"\\multicolumn{{{width}}}{{|c|}}{{}}")
+			else:
+				row_cells.append('')
+
+			column += width
 
-		assert dom.documentElement is not None
-		captionElements = dom.documentElement.getElementsByTagName("caption")
-		caption = ''
-		if captionElements:
-			caption = self.get_text(captionElements[0])
+		return column
 
+	def _make_table(self, core: str, caption: str) -> str:
 		colformatting = self.colformat()
 		table_latex = f"""
 			\\begin{{table}}[h]
@@ -178,3 +235,128 @@ class Table2Latex:
 			\\end{{table}}
 			"""
 		return table_latex
+
+	def convert(self, instr: str) -> str:
+		"""
+		Convert an html table to LaTeX.
+
+		:param instr: The html for the table.
+		"""
+
+		return self.convert_element(ElementTree.fromstring(instr))
+
+
+_text_align_re = re.compile(r"text-align:\s*(left|right|center)")
+_alignments = {"left": 'l', "right": 'r', "center": 'c'}
+
+
+def _cell_alignment(cell: Element) -> Optional[str]:
+	# Markdown sets either an align attribute or a style, depending on the version.
+	align = cell.get("align")
+
+	if align is None:
+		match = _text_align_re.search(cell.get("style", ''))
+		if match:
+			align = match.group(1)
+
+	return _alignments.get(align)  # type: ignore[arg-type]
+
+
+class BooktabsTable:
+	"""
+	Convert html tables to LaTeX with :func:`py2latex.tables.table_from_template`,
+	or :func:`py2latex.tables.longtable_from_template` for tables with many rows.
+
+	This gives markdown tables the same ``booktabs`` formatting as tables created from Python.
+	The header row is taken from the ``th`` cells in the first row,
+	and the alignment of each column from the first row's ``align`` attributes or ``text-align`` styles,
+	which markdown sets from the ``:---:`` syntax.
+
+	Tables with cells spanning multiple rows or columns are converted with :class:`~.Table2Latex` instead.
+	Tables without a caption are made into a plain ``tabular``, rather than a numbered float with an empty caption,
+	unless they are long enough to be made into a longtable.
+
+	To use it for markdown tables pass an instance to :func:`~.make_markdown`:
+
+	.. code-block:: python
+
+		md = make_markdown(table_converter=BooktabsTable())
+
+	:param longtable_threshold: Tables with more than this many rows, excluding the header, are made into longtables.
+	:param compact: Whether to emit the table body without aligning the cells.
+		See :func:`py2latex.tables.table_from_template`.
+	:param pos: The positioning of the table, e.g. ``"htp"``.
+	"""
+
+	def __init__(self, longtable_threshold: int = 40, *, compact: bool = False, pos: str = "htpb"):
+		self.longtable_threshold: int = longtable_threshold
+		self.compact: bool = compact
+		self.pos: str = pos
+
+	def convert_element(self, table: Element, render: Optional[Callable[[Element], str]] = None) -> str:
+		"""
+		Convert a table in an :class:`~xml.etree.ElementTree.Element` tree to LaTeX.
+
+		:param table: The ``table`` element.
+		:param render: Function which returns the LaTeX for the content of a cell.
+			By default the cell's text is escaped and any markup is discarded.
+		"""
+
+		if render is None:
+			render = _element_text
+
+		rows = [[cell for cell in row if cell.tag in {"td", "th"}] for row in _iter_rows(table)]
+
+		if any("colspan" in cell.attrib or "rowspan" in cell.attrib for row in rows for cell in row):
+			return Table2Latex().convert_element(table, render)
+
+		headers, body = self._split_header(rows)
+		colalign = [_cell_alignment(cell) or 'l' for cell in (rows[0] if rows else ())]
+
+		caption_element = table.find("caption")
+		caption = '' if caption_element is None else render(caption_element).strip()
+
+		tabular_data = [[render(cell).strip() for cell in row] for row in body]
+		header_row = [render(cell).strip() for cell in headers]
+
+		if len(body) > self.longtable_threshold:
+			make_table = longtable_from_template
+		elif caption:
+			make_table = table_from_template
+		else:
+			# Without a caption the table is not a float, so it has no number or label.
+			return tabular_from_template(
+					tabular_data,
+					headers=header_row,
+					disable_numparse=True,
+					colalign=colalign,
+					raw=True,
+					compact=self.compact,
+					)
+
+		return make_table(
+				tabular_data,
+				caption=caption,
+				headers=header_row,
+				pos=self.pos,
+				disable_numparse=True,
+				colalign=colalign,
+				raw=True,
+				compact=self.compact,
+				)
+
+	def convert(self, instr: str) -> str:
+		"""
+		Convert an html table to LaTeX.
+
+		:param instr: The html for the table.
+		"""
+
+		return self.convert_element(ElementTree.fromstring(instr))
+
+	@staticmethod
+	def _split_header(rows: List[List[Element]]) -> Tuple[List[Element], List[List[Element]]]:
+		if rows and rows[0] and all(cell.tag == "th" for cell in rows[0]):
+			return rows[0], rows[1:]
+		else:
+			return [], rows
@@ -70,33 +70,83 @@ def unescape_html_entities(text: str) -> str:
 	return out
 
 
+_latex_special_chars = (
+		('%', r"\%"),
+		('&', r"\&"),
+		('#', r"\#"),
+		('_', r"\_"),
+		('~', r"\textasciitilde{}"),
+		('^', r"\textasciicircum{}"),
+		)
+
+_html_entities = {"&amp;": r"\&", "&lt;": '<', "&gt;": '>'}
+
+# The parts of the text which need more than escaping individual characters.
+_latex_entities_re = re.compile(
+		r"""
+		(?=[\\$"&']|gls{|cite)  # quickly skip positions where nothing can match
+		(?:
+		(?P<latex>\\[A-Za-z@]+\*?(?:\[[^\]\n]*\])*(?:{(?:[^{}]|{[^{}]*})*})*)  # LaTeX commands and their arguments
+		|(?P<maths>\$\$.*?\$\$|\$[^$]*\$|\\\[.*?\\\]|\\\(.*?\\\))
+		|(?P<escaped>\\.)
+		|(?P<command>(?:gls|citep|cite){[^}]*})
+		|(?:"|&quot;)(?P<double_quoted>(?:(?!&quot;)[^"])*)(?:"|&quot;)
+		|(?<!\w)'(?P<single_quoted>[^\n]*?)'(?!\w)
+		|(?P<entity>&(?:amp|lt|gt);)
+		)
+		""",
+		flags=re.VERBOSE | re.DOTALL,
+		)
+
+
+def _escape_latex_chars(text: str) -> str:
+	# str.replace is much faster than str.translate with multi-character replacements.
+	for char, replacement in _latex_special_chars:
+		if char in text:
+			text = text.replace(char, replacement)
+
+	return text
+
+
 def escape_latex_entities(text: str) -> str:
 	"""
 	Escape latex reserved characters.
 
+	The special characters ``% & # _ ~ ^`` are escaped, unless already preceded by a backslash,
+	and text in single or double quotes is wrapped in ``\\enquote``.
+	The html entities ``&amp;``, ``&lt;``, ``&gt;`` and ``&quot;`` are decoded at the same time.
+
+	Maths between ``$`` signs, glossary and citation commands,
+	and LaTeX commands such as ``\\ref{fig:a_b}`` (including their arguments), are left unchanged.
+
+	The text may be only part of a line, so every ``%`` is escaped.
+	Comment lines in markdown are kept by :class:`~.CommentPreprocessor` before the text is escaped.
+
 	:param text:
 	"""
 
-	out = text
-	out = unescape_html_entities(out)
+	# people should escape { and } themselves as it conflicts with maths
 
-	out = re.sub(r"[^\n\\]%", r"\\%", out)
-	out = re.sub(r"[^\\]&", r"\\&", out)
-	out = re.sub(r"[^\\]#", r"\\#", out)
+	parts = []
+	position = 0
 
-	out = re.sub(r"\"([^\"]*)\"", r"\\enquote{\1}", out)
-	out = re.sub(r"\'([^\']*)\'", r"\\enquote{\1}", out)
+	for match in _latex_entities_re.finditer(text):
+		parts.append(_escape_latex_chars(text[position:match.start()]))
+		position = match.end()
+		kind = match.lastgroup
 
-	# out = start_single_quote_re.sub(r'\g<1>`', out)
-	# out = start_double_quote_re.sub(r'\g<1>``', out)
-	# out = end_double_quote_re.sub(r"''\g<1>", out)
+		if kind == "entity":
+			parts.append(_html_entities[match.group()])
+		elif kind in {"double_quoted", "single_quoted"}:
+			parts.append(f"\\enquote{{{escape_latex_entities(match.group(kind))}}}")
+		else:
+			parts.append(match.group())
 
-	# people should escape these themselves as it conflicts with maths
-	# out = out.replace('{', '\\{')
-	# out = out.replace('}', '\\}')
-	# do not do '$' here because it is dealt with by convert_maths
-	# out = out.replace('$', '\\$')
-	return out
+	if not position:
+		return _escape_latex_chars(text)
+
+	parts.append(_escape_latex_chars(text[position:]))
+	return ''.join(parts)
 
 
 def unescape_latex_entities(text: str) -> str:
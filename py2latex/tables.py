@@ -29,10 +29,12 @@
 # stdlib
 import re
 from functools import partial
+from itertools import zip_longest
 from textwrap import indent
-from typing import Any, Iterable, List, Optional, Sequence, Tuple, Union
+from typing import Any, Callable, Collection, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
 
 # 3rd party
+import numpy
 import pandas  # type: ignore[import-untyped]
 import tabulate
 from tabulate import Line, TableFormat
@@ -44,6 +46,8 @@ from py2latex.templates import templates
 __all__ = [
 		"SubTable",
 		"add_longtable_caption",
+		"default_font_metrics",
+		"estimate_column_widths",
 		"latex_format_builder",
 		"longtable_from_template",
 		"multicolumn",
@@ -82,6 +86,109 @@ def multicolumn(cols: int, pos: str, text: str) -> str:
 	return fr"\multicolumn{{{cols}}}{{{pos}}}{{{{{text}}}}}"
 
 
+_latex_escape_table = str.maketrans(tabulate.LATEX_ESCAPE_RULES)
+_latex_datarow = tabulate.DataRow('', '&', table_linebreak)
+
+
+class _EscapeMemo(Dict[str, str]):
+	"""
+	Cache of strings escaped for LaTeX.
+
+	Tables often contain the same few labels many times over, so each distinct string is only escaped once.
+	The cache is emptied once it grows past ``maxsize`` entries.
+	"""
+
+	maxsize: int = 65536
+
+	def __missing__(self, key: str) -> str:
+		if len(self) >= self.maxsize:
+			self.clear()
+
+		escaped = self[key] = key.translate(_latex_escape_table)
+		return escaped
+
+
+_escape_memo = _EscapeMemo()
+
+
+def _escape_cell(text: str) -> str:
+	"""
+	Escape LaTeX special characters in ``text`` using tabulate's escaping rules.
+
+	:param text:
+	"""
+
+	return _escape_memo[text]
+
+
+def _latex_row(
+		cell_values: Sequence[str],
+		colwidths: Sequence[int],
+		colaligns: Sequence[str],
+		raw: bool = False,
+		) -> str:
+	"""
+	Construct a row of a LaTeX table.
+
+	A replacement for tabulate's ``_latex_row`` which escapes each distinct cell value only once.
+
+	:param cell_values: The padded values of each cell.
+	:param colwidths:
+	:param colaligns:
+	:param raw: Whether to leave the cell values unescaped.
+	"""
+
+	if not raw:
+		cell_values = [_escape_memo[cell] for cell in cell_values]
+
+	return tabulate._build_simple_row(cell_values, _latex_datarow)  # type: ignore[attr-defined]
+
+
+def _escape_frame(frame: pandas.DataFrame, index: bool = True) -> pandas.DataFrame:
+	"""
+	Escape the string values and labels of a :class:`pandas.DataFrame` for LaTeX.
+
+	Each column is factorized so that each distinct value is only escaped once
+	(for categorical columns this reuses the existing categories).
+
+	:param frame:
+	:param index: Whether to also escape the index.
+	"""
+
+	def escape_values(values: Union[pandas.Series, pandas.Index]) -> numpy.ndarray:
+		codes, uniques = pandas.factorize(values)
+		escaped_uniques = numpy.array(
+				[_escape_cell(value) if isinstance(value, str) else value for value in uniques],
+				dtype=object,
+				)
+
+		escaped = numpy.asarray(values, dtype=object).copy()
+		present = codes >= 0
+		escaped[present] = escaped_uniques[codes[present]]
+		return escaped
+
+	def is_text(dtype: Any) -> bool:
+		return dtype == object or isinstance(dtype, (pandas.CategoricalDtype, pandas.StringDtype))
+
+	columns = {}
+
+	for position, dtype in enumerate(frame.dtypes):
+		column = frame.iloc[:, position].reset_index(drop=True)
+		if is_text(dtype):
+			column = pandas.Series(escape_values(column), dtype=object)
+		columns[position] = column
+
+	escaped_frame = pandas.DataFrame(columns)
+	escaped_frame.columns = [_escape_cell(label) if isinstance(label, str) else label for label in frame.columns]
+
+	if index and not isinstance(frame.index, pandas.MultiIndex) and is_text(frame.index.dtype):
+		escaped_frame.index = pandas.Index(escape_values(frame.index), name=frame.index.name)
+	else:
+		escaped_frame.index = frame.index
+
+	return escaped_frame
+
+
 def _latex_line_begin_tabular(colwidths, colaligns, booktabs=False, longtable=False, longtable_continued=False):
 	# Based on Bart Broere's fork of python-tabulate.
 	# https://github.com/bartbroere/python-tabulate
@@ -150,10 +257,7 @@ def latex_format_builder(
 		linebelowheader = [hline]
 		linebelow = [hline, r"\end{tabular}"]
 
-	if raw:
-		datarow = headerrow = partial(tabulate._latex_row, escrules={})  # type: ignore[attr-defined]
-	else:
-		datarow = headerrow = tabulate._latex_row  # type: ignore[attr-defined]
+	datarow = headerrow = partial(_latex_row, raw=raw)
 
 	return TableFormat(
 			lineabove=lineabove,
@@ -245,7 +349,7 @@ _subtables_template.globals["indent"] = indent
 
 
 def longtable_from_template(
-		tabular_data: Union[Sequence[Sequence[Any]]],
+		tabular_data: Union[Sequence[Sequence[Any]], numpy.ndarray],
 		*,
 		caption: str,
 		label: Optional[str] = None,
@@ -264,11 +368,17 @@ def longtable_from_template(
 		vspace: Union[Sequence[int], bool] = False,
 		raw: bool = True,
 		footer: Optional[str] = None,
+		compact: bool = False,
+		estimate_colwidths: bool = False,
+		font_metrics: Optional[Mapping[str, float]] = None,
 		) -> str:
 	"""
 	Create a ``longtable`` with ``booktabs`` formatting.
 
-	:param tabular_data:
+	:param tabular_data: The data for the table. May also be a :class:`pandas.DataFrame`,
+		or a NumPy structured or record array, in which case the field names are used as the default headers.
+		DataFrames with :class:`pandas.MultiIndex` columns or rows have their outer levels
+		grouped with ``multicolumn`` and ``multirow`` (which requires the ``multirow`` package).
 	:param caption: The caption for the table
 	:type caption: str
 	:param label: The label for the table.
@@ -296,6 +406,13 @@ def longtable_from_template(
 	:param raw: Whether latex markup in ``tabular_data`` should be unescaped. Default :py:obj:`False`
 	:type raw: bool
 	:param footer: Optional footer for the table. Inserted as raw LaTeX
+	:param compact: Whether to emit the table body without aligning the cells or indenting the rows.
+		This skips computing the column widths, and produces much smaller output for large tables.
+		Default :py:obj:`False`
+	:param estimate_colwidths: Whether to estimate the natural width of each column
+		with :func:`~.estimate_column_widths`, for columns without a width in ``colwidths``.
+		This allows a ``longtable`` to be typeset correctly on the first LaTeX run. Default :py:obj:`False`
+	:param font_metrics: Mapping of characters to their widths in ``em``, for estimating the column widths.
 
 	:return:
 	:rtype: str
@@ -319,6 +436,9 @@ def longtable_from_template(
 			vspace=vspace,
 			raw=raw,
 			footer=footer,
+			compact=compact,
+			estimate_colwidths=estimate_colwidths,
+			font_metrics=font_metrics,
 			)
 
 	return _longtable_template.render(
@@ -335,10 +455,7 @@ def longtable_from_template(
 
 def _make_body_only_formats(raw=False):
 
-	if raw:
-		datarow = headerrow = partial(tabulate._latex_row, escrules={})  # type: ignore[attr-defined]
-	else:
-		datarow = headerrow = tabulate._latex_row  # type: ignore[attr-defined]
+	datarow = headerrow = partial(_latex_row, raw=raw)
 
 	return TableFormat(
 			lineabove=None,
@@ -358,14 +475,16 @@ raw_body_only_format = _make_body_only_formats(raw=True)
 
 def _parse_rows(
 		rows: List[str],
-		tabular_data: Union[Sequence[Sequence[Any]]],
+		tabular_data: Union[Sequence[Sequence[Any]], numpy.ndarray],
 		headers: Sequence[str] = (),
+		showindex: Union[str, bool, Iterable[Any]] = "default",
 		) -> Tuple[str, List[str], int]:
 	"""
 
 	:param rows:
 	:param tabular_data:
 	:param headers:
+	:param showindex:
 	"""
 
 	header_len = 0
@@ -380,6 +499,9 @@ def _parse_rows(
 
 	if isinstance(tabular_data, pandas.DataFrame):
 		body_len = len(tabular_data.columns)
+		if (isinstance(showindex, str) and showindex in {"default", "always"}) or showindex is True:
+			# tabulate shows the index as additional columns.
+			body_len += tabular_data.index.nlevels
 	else:
 		body_len = max([len(subl) for subl in tabular_data])
 
@@ -388,6 +510,465 @@ def _parse_rows(
 	return header_row, body_rows, ncols
 
 
+def _per_column(value: Union[str, Iterable[str]], ncols: int, default: str) -> List[str]:
+	"""
+	Expand a per-table or per-column option (such as ``floatfmt``) to a list with one value per column.
+
+	:param value:
+	:param ncols:
+	:param default: The value for columns not covered by ``value``.
+	"""
+
+	if isinstance(value, str):
+		return [value] * ncols
+
+	values = list(value)
+	while len(values) < ncols:
+		values.append(default)
+
+	return values
+
+
+def _format_cells(
+		tabular_data: Any,
+		headers: Union[str, Sequence[str]] = (),
+		floatfmt: Union[str, Iterable[str]] = tabulate._DEFAULT_FLOATFMT,  # type: ignore[attr-defined]
+		missingval: Union[str, Iterable[str]] = tabulate._DEFAULT_MISSINGVAL,  # type: ignore[attr-defined]
+		showindex: Union[str, bool, Iterable[Any]] = "default",
+		) -> Tuple[List[str], List[List[str]]]:
+	"""
+	Format the headers and cells of a table as strings, without aligning or escaping them.
+
+	Unlike :func:`tabulate.tabulate` the column widths are never computed,
+	and numeric strings are left as they are rather than being reformatted.
+
+	:param tabular_data:
+	:param headers:
+	:param floatfmt:
+	:param missingval:
+	:param showindex:
+
+	:returns: The headers, and the cells of each row.
+	"""
+
+	rows, headers = tabulate._normalize_tabular_data(tabular_data, headers, showindex)[:2]  # type: ignore[attr-defined]
+
+	ncols = max([len(headers), *map(len, rows)]) if rows else len(headers)
+	floatfmts = _per_column(floatfmt, ncols, tabulate._DEFAULT_FLOATFMT)  # type: ignore[attr-defined]
+	missingvals = _per_column(missingval, ncols, tabulate._DEFAULT_MISSINGVAL)  # type: ignore[attr-defined]
+
+	def format_cell(value: Any, column: int) -> str:
+		if value is None:
+			return missingvals[column]
+		elif isinstance(value, float):
+			return format(value, floatfmts[column])
+		elif isinstance(value, bytes):
+			return value.decode("UTF-8")
+		else:
+			return str(value)
+
+	cells = [[format_cell(value, column) for column, value in enumerate(row)] for row in rows]
+
+	return [str(header) for header in headers], cells
+
+
+def _compact_rows(
+		tabular_data: Any,
+		headers: Union[str, Sequence[str]] = (),
+		floatfmt: Union[str, Iterable[str]] = tabulate._DEFAULT_FLOATFMT,  # type: ignore[attr-defined]
+		missingval: Union[str, Iterable[str]] = tabulate._DEFAULT_MISSINGVAL,  # type: ignore[attr-defined]
+		showindex: Union[str, bool, Iterable[Any]] = "default",
+		raw: bool = True,
+		) -> Tuple[List[str], bool]:
+	"""
+	Format the rows of a table without aligning or padding the cells.
+
+	:param tabular_data:
+	:param headers:
+	:param floatfmt:
+	:param missingval:
+	:param showindex:
+	:param raw: Whether latex markup in ``tabular_data`` should be left unescaped.
+
+	:returns: The formatted rows, and whether the first row is the header row.
+	"""
+
+	headers, cells = _format_cells(tabular_data, headers, floatfmt, missingval, showindex)
+
+	escape: Callable[[str], str]
+
+	if raw:
+		escape = str
+	else:
+		escape = _escape_cell
+
+	formatted_rows = []
+
+	if headers:
+		formatted_rows.append('&'.join([escape(header) for header in headers]) + table_linebreak)
+
+	for row in cells:
+		formatted_rows.append('&'.join([escape(cell) for cell in row]) + table_linebreak)
+
+	return formatted_rows, bool(headers)
+
+
+#: Approximate widths of the printable ASCII characters in Computer Modern Roman, in ``em``.
+default_font_metrics: Dict[str, float] = {
+		' ': 0.333,
+		'!': 0.278,
+		'"': 0.5,
+		'#': 0.833,
+		'$': 0.5,
+		'%': 0.833,
+		'&': 0.778,
+		"'": 0.278,
+		'(': 0.389,
+		')': 0.389,
+		'*': 0.5,
+		'+': 0.778,
+		',': 0.278,
+		'-': 0.333,
+		'.': 0.278,
+		'/': 0.5,
+		**dict.fromkeys("0123456789", 0.5),
+		':': 0.278,
+		';': 0.278,
+		'<': 0.778,
+		'=': 0.778,
+		'>': 0.778,
+		'?': 0.472,
+		'@': 0.778,
+		'A': 0.75,
+		'B': 0.708,
+		'C': 0.722,
+		'D': 0.764,
+		'E': 0.681,
+		'F': 0.653,
+		'G': 0.785,
+		'H': 0.75,
+		'I': 0.361,
+		'J': 0.514,
+		'K': 0.778,
+		'L': 0.625,
+		'M': 0.917,
+		'N': 0.75,
+		'O': 0.778,
+		'P': 0.681,
+		'Q': 0.778,
+		'R': 0.736,
+		'S': 0.556,
+		'T': 0.722,
+		'U': 0.75,
+		'V': 0.75,
+		'W': 1.028,
+		'X': 0.75,
+		'Y': 0.75,
+		'Z': 0.611,
+		'[': 0.278,
+		'\\': 0.5,
+		']': 0.278,
+		'^': 0.5,
+		'_': 0.5,
+		'`': 0.278,
+		'a': 0.5,
+		'b': 0.556,
+		'c': 0.444,
+		'd': 0.556,
+		'e': 0.444,
+		'f': 0.306,
+		'g': 0.5,
+		'h': 0.556,
+		'i': 0.278,
+		'j': 0.306,
+		'k': 0.528,
+		'l': 0.278,
+		'm': 0.833,
+		'n': 0.556,
+		'o': 0.5,
+		'p': 0.556,
+		'q': 0.528,
+		'r': 0.392,
+		's': 0.394,
+		't': 0.389,
+		'u': 0.556,
+		'v': 0.528,
+		'w': 0.722,
+		'x': 0.528,
+		'y': 0.528,
+		'z': 0.444,
+		'{': 0.5,
+		'|': 0.278,
+		'}': 0.5,
+		'~': 0.5,
+		}
+
+
+def estimate_column_widths(
+		tabular_data: Union[Sequence[Sequence[Any]], numpy.ndarray],
+		headers: Sequence[str] = (),
+		*,
+		floatfmt: Union[str, Iterable[str]] = tabulate._DEFAULT_FLOATFMT,  # type: ignore[attr-defined]
+		missingval: Union[str, Iterable[str]] = tabulate._DEFAULT_MISSINGVAL,  # type: ignore[attr-defined]
+		showindex: Union[str, bool, Iterable[Any]] = "default",
+		font_metrics: Optional[Mapping[str, float]] = None,
+		default_width: float = 0.5,
+		) -> List[str]:
+	"""
+	Estimate the natural width of each column of a table, for use as the ``colwidths`` of the table functions.
+
+	Giving a ``longtable`` explicit column widths means it is typeset correctly on the first LaTeX run,
+	rather than waiting for the widths to stabilise through the ``.aux`` file.
+
+	The width of each cell is the sum of the widths of its characters,
+	which are looked up for a whole column at once.
+
+	:param tabular_data:
+	:param headers: A sequence of column headers
+	:param floatfmt: The formatting of :class:`float` values. Default ``"g"``
+	:param missingval:
+	:param showindex:
+	:param font_metrics: Mapping of characters to their widths in ``em``.
+		Defaults to the approximate widths in :py:data:`~.default_font_metrics`.
+	:param default_width: The width in ``em`` of characters not in ``font_metrics``.
+
+	:return: The width of each column, e.g. ``"4.72em"``.
+	"""
+
+	if _is_structured_array(tabular_data):
+		tabular_data, field_names, _ = _format_structured_array(tabular_data, floatfmt)  # type: ignore[arg-type]
+		if not headers:
+			headers = field_names
+
+	headers, cells = _format_cells(tabular_data, headers, floatfmt, missingval, showindex)
+
+	if font_metrics is None:
+		font_metrics = default_font_metrics
+
+	lookup = numpy.full(max([256, *map(ord, font_metrics)]) + 1, default_width)
+	lookup[0] = 0  # Used to pad shorter strings in the array
+	for char, width in font_metrics.items():
+		lookup[ord(char)] = width
+
+	ncols = max([len(headers), *map(len, cells)]) if cells else len(headers)
+	columns: List[List[str]] = [[] for _ in range(ncols)]
+
+	for header_idx, header in enumerate(headers):
+		columns[header_idx].append(header)
+
+	for row in cells:
+		for column, cell in zip(columns, row):
+			column.append(cell)
+
+	widths = []
+
+	for column in columns:
+		strings = numpy.array(column, dtype=str)
+
+		if not strings.dtype.itemsize:
+			widths.append("0em")
+			continue
+
+		codepoints = strings.view(numpy.uint32).reshape(len(strings), -1)
+		char_widths = lookup[numpy.minimum(codepoints, len(lookup) - 1)]
+		char_widths[codepoints >= len(lookup)] = default_width
+		widths.append(f"{char_widths.sum(axis=1).max():.2f}em")
+
+	return widths
+
+
+def _is_structured_array(tabular_data: Any) -> bool:
+	"""
+	Returns whether ``tabular_data`` is a NumPy structured (or record) array.
+
+	:param tabular_data:
+	"""
+
+	return isinstance(tabular_data, numpy.ndarray) and tabular_data.dtype.names is not None
+
+
+def _format_structured_array(
+		array: numpy.ndarray,
+		floatfmt: Union[str, Iterable[str]] = tabulate._DEFAULT_FLOATFMT,  # type: ignore[attr-defined]
+		numalign: Optional[str] = "decimal",
+		stralign: Optional[str] = "left",
+		) -> Tuple[List[Tuple[str, ...]], List[str], List[Optional[str]]]:
+	"""
+	Format each field of a NumPy structured array as a column of strings.
+
+	Each column is formatted in a single vectorised operation,
+	rather than boxing every value as a Python object first.
+
+	:param array:
+	:param floatfmt: The formatting of :class:`float` values, either for all columns or per column.
+	:param numalign: The alignment of numeric columns.
+	:param stralign: The alignment of all other columns.
+
+	:returns: The formatted rows, the field names, and the alignment of each column for :func:`tabulate.tabulate`.
+
+	:raises TypeError: If ``array`` is not a structured array.
+	"""
+
+	if array.dtype.names is None:
+		raise TypeError("Expected a structured array.")
+
+	names = list(array.dtype.names)
+
+	if isinstance(floatfmt, str):
+		floatfmts = [floatfmt] * len(names)
+	else:
+		floatfmts = list(floatfmt)
+		while len(floatfmts) < len(names):
+			floatfmts.append(tabulate._DEFAULT_FLOATFMT)  # type: ignore[attr-defined]
+
+	columns = []
+	alignments = []
+
+	for name, fmt in zip(names, floatfmts):
+		column = array[name]
+		kind = column.dtype.kind
+
+		if kind == 'f':
+			try:
+				formatted = numpy.char.mod(f"%{fmt}", column)
+			except (TypeError, ValueError):
+				# Format specifications that have no printf equivalent, such as ``","``.
+				formatted = numpy.array([format(value, fmt) for value in column.tolist()], dtype=str)
+			alignments.append(numalign)
+		elif kind in "iub":
+			formatted = column.astype(str)
+			alignments.append(numalign)
+		elif kind == 'S':
+			formatted = numpy.char.decode(column, "UTF-8")
+			alignments.append(stralign)
+		else:
+			formatted = column.astype(str)
+			alignments.append(stralign)
+
+		columns.append(formatted.tolist())
+
+	return list(zip(*columns)), names, alignments
+
+
+def _label_text(label: Any, raw: bool) -> str:
+	"""
+	Convert an index or column label to a string for use in a table.
+
+	:param label:
+	:param raw: Whether the label should be left unescaped.
+	"""
+
+	if label is None or (not isinstance(label, str) and pandas.isna(label)):
+		return ''
+	elif raw:
+		return str(label)
+	else:
+		return _escape_cell(str(label))
+
+
+def _run_starts(codes: Sequence[numpy.ndarray]) -> numpy.ndarray:
+	"""
+	Returns a boolean mask of the positions at which a new run of labels begins in a :class:`pandas.MultiIndex`.
+
+	A run ends whenever the label changes in the last level in ``codes`` or in any of the levels before it.
+
+	:param codes: The codes of each level, outermost first.
+	"""
+
+	starts = numpy.zeros(len(codes[0]), dtype=bool)
+	starts[:1] = True
+
+	for level_codes in codes:
+		starts[1:] |= level_codes[1:] != level_codes[:-1]
+
+	return starts
+
+
+def _multiindex_header_rows(columns: pandas.MultiIndex, offset: int, raw: bool) -> List[str]:
+	r"""
+	Construct the header rows for the outer levels of :class:`pandas.MultiIndex` columns.
+
+	Adjacent columns sharing a label are merged with ``\multicolumn``, and underlined with ``\cmidrule``.
+
+	:param columns:
+	:param offset: The number of index columns to the left of the data.
+	:param raw: Whether the labels should be left unescaped.
+	"""
+
+	codes = [numpy.asarray(level_codes) for level_codes in columns.codes]
+	header_rows = []
+
+	for level in range(columns.nlevels - 1):
+		starts = numpy.flatnonzero(_run_starts(codes[:level + 1]))
+		lengths = numpy.diff(numpy.append(starts, len(columns)))
+		labels = columns.get_level_values(level).take(starts)
+
+		cells = [''] * offset
+		rules = []
+
+		for start, length, label in zip(starts.tolist(), lengths.tolist(), labels):
+			text = _label_text(label, raw)
+			if length > 1:
+				cells.append(multicolumn(length, 'c', text))
+				rules.append(fr"\cmidrule(lr){{{offset + start + 1}-{offset + start + length}}}")
+			else:
+				cells.append(text)
+
+		header_rows.append(f"{' & '.join(cells)} \\\\ {''.join(rules)}".rstrip())
+
+	return header_rows
+
+
+def _multiindex_index_cells(index: pandas.Index, raw: bool) -> List[str]:
+	r"""
+	Construct the cells for the index columns of each row of a table.
+
+	The outer levels of a :class:`pandas.MultiIndex` are grouped with ``\multirow``.
+
+	:param index:
+	:param raw: Whether the labels should be left unescaped.
+
+	:returns: The index cells of each row, joined with ``&``.
+	"""
+
+	if not isinstance(index, pandas.MultiIndex):
+		return [_label_text(label, raw) for label in index]
+
+	codes = [numpy.asarray(level_codes) for level_codes in index.codes]
+	columns = []
+
+	for level in range(index.nlevels):
+		labels = index.get_level_values(level)
+
+		if level == index.nlevels - 1:
+			columns.append([_label_text(label, raw) for label in labels])
+			continue
+
+		starts = numpy.flatnonzero(_run_starts(codes[:level + 1]))
+		lengths = numpy.diff(numpy.append(starts, len(index)))
+
+		cells = numpy.full(len(index), '', dtype=object)
+		cells[starts] = [
+				fr"\multirow{{{length}}}{{*}}{{{_label_text(label, raw)}}}" if length > 1 else _label_text(label, raw)
+				for length, label in zip(lengths.tolist(), labels.take(starts))
+				]
+		columns.append(cells.tolist())
+
+	return [" & ".join(row) for row in zip(*columns)]
+
+
+def _is_multiindex_frame(tabular_data: Any) -> bool:
+	"""
+	Returns whether ``tabular_data`` is a :class:`pandas.DataFrame` with hierarchical rows or columns.
+
+	:param tabular_data:
+	"""
+
+	return isinstance(tabular_data, pandas.DataFrame) and (
+			isinstance(tabular_data.columns, pandas.MultiIndex) or isinstance(tabular_data.index, pandas.MultiIndex)
+			)
+
+
 def parse_vspace(
 		ncols: int,
 		vspace: Union[Sequence[int], bool] = False,
@@ -427,7 +1008,7 @@ def parse_hlines(
 
 
 def table_from_template(
-		tabular_data: Union[Sequence[Sequence[Any]]],
+		tabular_data: Union[Sequence[Sequence[Any]], numpy.ndarray],
 		*,
 		caption: str,
 		label: Optional[str] = None,
@@ -446,11 +1027,17 @@ def table_from_template(
 		vspace: Union[Sequence[int], bool] = False,
 		raw: bool = True,
 		footer: Optional[str] = None,
+		compact: bool = False,
+		estimate_colwidths: bool = False,
+		font_metrics: Optional[Mapping[str, float]] = None,
 		) -> str:
 	"""
 	Create a ``table`` with ``booktabs`` formatting.
 
-	:param tabular_data:
+	:param tabular_data: The data for the table. May also be a :class:`pandas.DataFrame`,
+		or a NumPy structured or record array, in which case the field names are used as the default headers.
+		DataFrames with :class:`pandas.MultiIndex` columns or rows have their outer levels
+		grouped with ``multicolumn`` and ``multirow`` (which requires the ``multirow`` package).
 	:param caption: The caption for the table
 	:type caption: str
 	:param label: The label for the table.
@@ -478,6 +1065,13 @@ def table_from_template(
 	:param raw: Whether latex markup in ``tabular_data`` should be unescaped. Default :py:obj:`False`
 	:type raw: bool
 	:param footer: Optional footer for the table. Inserted as raw LaTeX
+	:param compact: Whether to emit the table body without aligning the cells or indenting the rows.
+		This skips computing the column widths, and produces much smaller output for large tables.
+		Default :py:obj:`False`
+	:param estimate_colwidths: Whether to estimate the natural width of each column
+		with :func:`~.estimate_column_widths`, for columns without a width in ``colwidths``.
+		This allows a ``longtable`` to be typeset correctly on the first LaTeX run. Default :py:obj:`False`
+	:param font_metrics: Mapping of characters to their widths in ``em``, for estimating the column widths.
 
 	:return:
 	:rtype: str
@@ -501,6 +1095,9 @@ def table_from_template(
 			vspace=vspace,
 			raw=raw,
 			footer=footer,
+			compact=compact,
+			estimate_colwidths=estimate_colwidths,
+			font_metrics=font_metrics,
 			)
 
 	return _table_template.render(
@@ -516,7 +1113,7 @@ def table_from_template(
 
 
 def tabular_from_template(
-		tabular_data: Union[Sequence[Sequence[Any]]],
+		tabular_data: Union[Sequence[Sequence[Any]], numpy.ndarray],
 		*,
 		headers: Sequence[str] = (),
 		floatfmt: Union[str, Iterable[str]] = tabulate._DEFAULT_FLOATFMT,  # type: ignore[attr-defined]
@@ -532,6 +1129,9 @@ def tabular_from_template(
 		vspace: Union[Sequence[int], bool] = False,
 		raw: bool = True,
 		footer: Optional[str] = None,
+		compact: bool = False,
+		estimate_colwidths: bool = False,
+		font_metrics: Optional[Mapping[str, float]] = None,
 		no_lines: bool = False,
 		left_margin: bool = True,
 		right_margin: bool = True,
@@ -539,7 +1139,10 @@ def tabular_from_template(
 	"""
 	Create a ``tabular`` environment with ``booktabs`` formatting.
 
-	:param tabular_data:
+	:param tabular_data: The data for the table. May also be a :class:`pandas.DataFrame`,
+		or a NumPy structured or record array, in which case the field names are used as the default headers.
+		DataFrames with :class:`pandas.MultiIndex` columns or rows have their outer levels
+		grouped with ``multicolumn`` and ``multirow`` (which requires the ``multirow`` package).
 	:param headers: A sequence of column headers
 	:param floatfmt: The formatting of :class:`float` values. Default ``"g"``
 	:param numalign:
@@ -561,6 +1164,13 @@ def tabular_from_template(
 	:param raw: Whether latex markup in ``tabular_data`` should be unescaped. Default :py:obj:`False`
 	:type raw: bool
 	:param footer: Optional footer for the table. Inserted as raw LaTeX
+	:param compact: Whether to emit the table body without aligning the cells or indenting the rows.
+		This skips computing the column widths, and produces much smaller output for large tables.
+		Default :py:obj:`False`
+	:param estimate_colwidths: Whether to estimate the natural width of each column
+		with :func:`~.estimate_column_widths`, for columns without a width in ``colwidths``.
+		This allows a ``longtable`` to be typeset correctly on the first LaTeX run. Default :py:obj:`False`
+	:param font_metrics: Mapping of characters to their widths in ``em``, for estimating the column widths.
 	:param no_lines: Whether to suppress horizontal lines in the table. Default :py:obj:`False`
 	:param left_margin: Whether to include a margin to the left of the table. Default :py:obj:`True`
 	:param right_margin: Whether to include a margin to the right of the table. Default :py:obj:`True`
@@ -587,6 +1197,9 @@ def tabular_from_template(
 			vspace=vspace,
 			raw=raw,
 			footer=footer,
+			compact=compact,
+			estimate_colwidths=estimate_colwidths,
+			font_metrics=font_metrics,
 			)
 
 	if not left_margin:
@@ -607,7 +1220,10 @@ def tabular_from_template(
 class SubTable:
 	"""
 
-	:param tabular_data:
+	:param tabular_data: The data for the table. May also be a :class:`pandas.DataFrame`,
+		or a NumPy structured or record array, in which case the field names are used as the default headers.
+		DataFrames with :class:`pandas.MultiIndex` columns or rows have their outer levels
+		grouped with ``multicolumn`` and ``multirow`` (which requires the ``multirow`` package).
 	:param caption: The caption for the table
 	:type caption: str
 	:param label: The label for the table.
@@ -633,11 +1249,18 @@ class SubTable:
 	:param raw: Whether latex markup in ``tabular_data`` should be unescaped. Default :py:obj:`False`
 	:type raw: bool
 	:param footer: Optional footer for the table. Inserted as raw LaTeX
+	:param compact: Whether to emit the table body without aligning the cells or indenting the rows.
+		This skips computing the column widths, and produces much smaller output for large tables.
+		Default :py:obj:`False`
+	:param estimate_colwidths: Whether to estimate the natural width of each column
+		with :func:`~.estimate_column_widths`, for columns without a width in ``colwidths``.
+		This allows a ``longtable`` to be typeset correctly on the first LaTeX run. Default :py:obj:`False`
+	:param font_metrics: Mapping of characters to their widths in ``em``, for estimating the column widths.
 	"""
 
 	def __init__(
 			self,
-			tabular_data: Union[Sequence[Sequence[Any]]],
+			tabular_data: Union[Sequence[Sequence[Any]], numpy.ndarray],
 			*,
 			caption: str,
 			label: Optional[str] = None,
@@ -655,26 +1278,122 @@ class SubTable:
 			vspace: Union[Sequence[int], bool] = False,
 			raw: bool = True,
 			footer: Optional[str] = None,
+			compact: bool = False,
+			estimate_colwidths: bool = False,
+			font_metrics: Optional[Mapping[str, float]] = None,
 			) -> None:
 
-		if raw:
+		tabulate_colalign = None
+
+		if _is_structured_array(tabular_data):
+			tabular_data, field_names, tabulate_colalign = _format_structured_array(
+					tabular_data,  # type: ignore[arg-type]
+					floatfmt=floatfmt,
+					numalign=numalign,
+					stralign=stralign,
+					)
+			if not headers:
+				headers = field_names
+			disable_numparse = True
+
+		index_cells: List[str] = []
+		index_levels = 0
+		index_header = ''
+		upper_header_rows: List[str] = []
+		group_starts: Collection[int] = ()
+
+		if _is_multiindex_frame(tabular_data):
+			frame: pandas.DataFrame = tabular_data
+
+			if showindex in {"default", "always", True}:
+				index_cells = _multiindex_index_cells(frame.index, raw)
+				index_levels = frame.index.nlevels
+				index_header = " & ".join([_label_text(name, raw) for name in frame.index.names])
+
+				if isinstance(frame.index, pandas.MultiIndex):
+					group_ids = frame.groupby(level=0, sort=False).ngroup().to_numpy()
+					group_starts = set((numpy.flatnonzero(group_ids[1:] != group_ids[:-1]) + 1).tolist())
+
+			if isinstance(frame.columns, pandas.MultiIndex):
+				upper_header_rows = _multiindex_header_rows(frame.columns, frame.index.nlevels * bool(index_cells), raw)
+				frame = frame.set_axis(frame.columns.get_level_values(-1), axis=1)
+
+			if not headers:
+				headers = [_label_text(label, True) for label in frame.columns]
+
+			tabular_data = frame
+			showindex = False
+
+		escaped = raw
+
+		if not raw and isinstance(tabular_data, pandas.DataFrame):
+			tabular_data = _escape_frame(tabular_data, index=showindex in {"default", "always", True})
+			if headers and not isinstance(headers, str):
+				headers = [_escape_cell(str(header)) for header in headers]
+			escaped = True
+
+		if escaped:
 			tablefmt = raw_body_only_format
 		else:
 			tablefmt = body_only_format
 
-		rows = tabulate.tabulate(
-				tabular_data,
-				tablefmt=tablefmt,
-				headers=headers,
-				floatfmt=floatfmt,
-				numalign=numalign,
-				stralign=stralign,
-				missingval=missingval,
-				showindex=showindex,
-				disable_numparse=disable_numparse,  # colalign=colalign,
-				).split('\n')
-
-		header_row, body_rows, ncols = _parse_rows(rows, tabular_data, headers)
+		if compact:
+			rows, has_header = _compact_rows(
+					tabular_data,
+					headers=headers,
+					floatfmt=floatfmt,
+					missingval=missingval,
+					showindex=showindex,
+					raw=escaped,
+					)
+			if has_header and not headers:
+				# e.g. a DataFrame, whose column names tabulate uses as the headers.
+				rows = rows[1:]
+			separator = '&'
+		else:
+			rows = tabulate.tabulate(
+					tabular_data,
+					tablefmt=tablefmt,
+					headers=headers,
+					floatfmt=floatfmt,
+					numalign=numalign,
+					stralign=stralign,
+					missingval=missingval,
+					showindex=showindex,
+					disable_numparse=disable_numparse,
+					colalign=tabulate_colalign,
+					).split('\n')
+			separator = " & "
+
+		if estimate_colwidths:
+			# The index columns are not estimated, so their widths are left as given.
+			estimated_widths: List[Optional[str]] = [None] * index_levels
+			estimated_widths.extend(
+					estimate_column_widths(
+							tabular_data,
+							headers,
+							floatfmt=floatfmt,
+							missingval=missingval,
+							showindex=showindex,
+							font_metrics=font_metrics,
+							)
+					)
+
+			colwidths = [
+					width if width is not None else estimate
+					for width, estimate in zip_longest(colwidths or (), estimated_widths)
+					]
+
+		header_row, body_rows, ncols = _parse_rows(rows, tabular_data, headers, showindex)
+
+		if index_cells:
+			ncols += len(tabular_data.index.names)  # type: ignore[union-attr]
+			header_row = f"{index_header}{separator}{header_row}"
+			body_rows = [f"{cells}{separator}{row}" for cells, row in zip(index_cells, body_rows)]
+
+		if upper_header_rows:
+			header_row = '\n'.join([*upper_header_rows, header_row])
+
 		add_vspace, vspace = parse_vspace(ncols, vspace)
 		add_hlines, hlines = parse_hlines(len(body_rows), hlines)
 		col_alignment = parse_column_alignments(colalign, colwidths, vlines, ncols)
@@ -686,10 +1405,13 @@ class SubTable:
 			row = re.sub(r"(\\multicolumn{4\}{.*}{{.*}}\s*)&(\s*)&(\s*)&", r"\1 \2 \3", row)
 			row = re.sub(r"(\\multicolumn{5\}{.*}{{.*}}\s*)&(\s*)&(\s*)&(\s*)&", r"\1 \2 \3 \4", row)
 
-			if add_vspace and row_idx in vspace:
-				table_body += "\\addlinespace"
+			# Rules must be kept apart from any control sequence at the start of the row.
+			rule_end = '' if row[:1].isspace() else '\n'
+
+			if (add_vspace and row_idx in vspace) or row_idx in group_starts:
+				table_body += f"\\addlinespace{rule_end}"
 			if add_hlines and row_idx in hlines:
-				table_body += "\\midrule"
+				table_body += f"\\midrule{rule_end}"
 
 			table_body += f"{row}\n"
 
@@ -699,7 +1421,7 @@ class SubTable:
 		self.caption: str = str(caption)
 		self.label: str = str(label)
 		self.header_row: str = header_row
-		self.table_body: str = indent(table_body, "       ")
+		self.table_body: str = table_body if compact else indent(table_body, "       ")
 		self.ncols: int = ncols
 		self.colalign: str = ''.join(col_alignment)
 		self.footer: Optional[str] = footer
@@ -795,13 +1517,14 @@ def parse_column_alignments(
 			if width is None:
 				alignment_elements.append('l')
 			else:
-				alignment_elements.append(fr">{{\raggedright}}p{{{width}}}")
+				# \arraybackslash restores \\ for ending the row, should this be the last column.
+				alignment_elements.append(fr">{{\raggedright\arraybackslash}}p{{{width}}}")
 
 		elif alignment.startswith('h'):
 			if width is None:
 				alignment_elements.append('l')
 			else:
-				alignment_elements.append(fr">{{\raggedright\hangindent=1em}}p{{{width}}}")
+				alignment_elements.append(fr">{{\raggedright\hangindent=1em\arraybackslash}}p{{{width}}}")
 
 		elif alignment.startswith('r') or alignment.lower() == "decimal":
 			if width is None:
@@ -0,0 +1,38 @@
+# stdlib
+import pathlib
+
+# 3rd party
+import pytest
+
+# this package
+from py2latex.markdown_parser import parse_markdown
+
+pytest.importorskip("markdown_it")
+
+demo_dir = pathlib.Path(__file__).parent.parent / "demo"
+
+snippets = {
+		"emphasis": "Some *emphasis*, **strong** text and `code`.",
+		"headings": "# Chapter\n\n## Section\n\nText under the section.",
+		"lists": "* one\n* two\n    * nested\n\nBetween the lists.\n\n1. first\n2. second",
+		"quote": "> A quotation\n> over two lines.",
+		"code": "```python\nprint('hello & goodbye')\n```\n\n    indented <code>",
+		"table": "| a | b |\n|---|--:|\n| 1 | 2 |\n| 3 | 4 |",
+		"links": "A [link](http://example.com/a_b) and <http://example.com>.",
+		"email": "Write to <someone@example.com> or <first_last@example.org>.",
+		"maths": "Inline $x^2$ and display $$a = b$$ maths, and 50% of \\$5.",
+		"maths in code": "Maths $x$ and code:\n\n    plain $x$ code\n\n~~~\n$y$\n~~~",
+		"commands": "A gls{key}, citep{ref} and H<sub>2</sub>O and x<sup>2</sup>.",
+		"quotes": "Some 'single' and \"double\" quotes & ampersands.",
+		}
+
+
+@pytest.mark.parametrize(
+		"source",
+		[
+				*(pytest.param(path.read_text(), id=path.name) for path in sorted(demo_dir.glob("*.md"))),
+				*(pytest.param(source, id=name) for name, source in snippets.items()),
+				],
+		)
+def test_backends_agree(source: str):
+	assert parse_markdown(source, backend="markdown-it") == parse_markdown(source)
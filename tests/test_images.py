@@ -0,0 +1,169 @@
+# stdlib
+import http.server
+import threading
+import time
+from typing import Dict, Iterator, List, Tuple
+
+# 3rd party
+import pytest
+
+# this package
+from py2latex.markdown_parser.images import ImageResolver
+
+IMAGES: Dict[str, Tuple[bytes, str]] = {
+		"/a.png": (b"image a", '"etag-a"'),
+		"/b.png": (b"image b", '"etag-b"'),
+		"/c.png": (b"image c", '"etag-c"'),
+		"/d.png": (b"image d", '"etag-d"'),
+		}
+
+
+class StubServer(http.server.ThreadingHTTPServer):
+	daemon_threads = True
+
+	def __init__(self):
+		super().__init__(("127.0.0.1", 0), StubHandler)
+		self.requests: List[Tuple[str, Dict[str, str]]] = []
+		self.in_flight = 0
+		self.max_in_flight = 0
+		self.delay = 0.0
+		self.lock = threading.Lock()
+
+	@property
+	def url(self) -> str:
+		return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class StubHandler(http.server.BaseHTTPRequestHandler):
+	protocol_version = "HTTP/1.1"
+	server: StubServer
+
+	def do_GET(self) -> None:  # noqa: D102
+		server = self.server
+
+		with server.lock:
+			server.requests.append((self.path, dict(self.headers)))
+			server.in_flight += 1
+			server.max_in_flight = max(server.max_in_flight, server.in_flight)
+
+		try:
+			time.sleep(server.delay)
+
+			if self.path not in IMAGES:
+				self.send_response(404)
+				self.send_header("Content-Length", '0')
+				self.end_headers()
+				return
+
+			body, etag = IMAGES[self.path]
+
+			if self.headers.get("If-None-Match") == etag:
+				self.send_response(304)
+				self.send_header("ETag", etag)
+				self.send_header("Content-Length", '0')
+				self.end_headers()
+				return
+
+			self.send_response(200)
+			self.send_header("ETag", etag)
+			self.send_header("Content-Length", str(len(body)))
+			self.end_headers()
+			self.wfile.write(body)
+
+		finally:
+			with server.lock:
+				server.in_flight -= 1
+
+	def log_message(self, *args) -> None:
+		pass
+
+
+@pytest.fixture()
+def server() -> Iterator[StubServer]:
+	stub = StubServer()
+	thread = threading.Thread(target=stub.serve_forever, daemon=True)
+	thread.start()
+
+	try:
+		yield stub
+	finally:
+		stub.shutdown()
+		stub.server_close()
+
+
+def test_resolve(server: StubServer, tmp_path):
+	resolver = ImageResolver(tmp_path)
+	path = resolver.resolve(f"{server.url}/a.png")
+
+	assert path is not None
+	assert path.read_bytes() == b"image a"
+	assert path.suffix == ".png"
+
+	# Each URL is only requested once per resolver.
+	assert resolver.resolve(f"{server.url}/a.png") == path
+	assert len(server.requests) == 1
+
+	resolver.close()
+
+
+def test_resolve_many_parallel(server: StubServer, tmp_path):
+	server.delay = 0.2
+	urls = [f"{server.url}{name}" for name in IMAGES]
+
+	resolver = ImageResolver(tmp_path, workers=4)
+	paths = resolver.resolve_many(urls)
+
+	assert list(paths) == urls
+	for name, url in zip(IMAGES, urls):
+		assert paths[url] is not None
+		assert paths[url].read_bytes() == IMAGES[name][0]  # type: ignore[union-attr]
+
+	assert server.max_in_flight > 1
+	assert len(server.requests) == len(urls)
+
+
+def test_revalidation(server: StubServer, tmp_path):
+	url = f"{server.url}/b.png"
+
+	first = ImageResolver(tmp_path).resolve(url)
+	assert first is not None
+
+	# A new resolver, e.g. in a later run, revalidates the cached image rather than downloading it again.
+	second = ImageResolver(tmp_path).resolve(url)
+	assert second == first
+
+	assert len(server.requests) == 2
+	assert server.requests[1][1].get("If-None-Match") == '"etag-b"'
+
+
+def test_not_found(server: StubServer, tmp_path):
+	resolver = ImageResolver(tmp_path)
+
+	assert resolver.resolve(f"{server.url}/missing.png") is None
+	assert resolver.resolve_many([f"{server.url}/missing.png", f"{server.url}/c.png"]) == {
+			f"{server.url}/missing.png": None,
+			f"{server.url}/c.png": resolver.cached(f"{server.url}/c.png"),
+			}
+
+
+def test_not_found_uses_cached(server: StubServer, tmp_path, monkeypatch):
+	url = f"{server.url}/d.png"
+	cached = ImageResolver(tmp_path).resolve(url)
+	assert cached is not None
+
+	# The image is no longer available, so the copy in the cache is used.
+	monkeypatch.delitem(IMAGES, "/d.png")
+	assert ImageResolver(tmp_path).resolve(url) == cached
+
+
+def test_offline(server: StubServer, tmp_path):
+	url = f"{server.url}/a.png"
+	cached = ImageResolver(tmp_path).resolve(url)
+	assert len(server.requests) == 1
+
+	resolver = ImageResolver(tmp_path, offline=True)
+	assert resolver.resolve(url) == cached
+	assert resolver.resolve_many([url, f"{server.url}/b.png"]) == {url: cached, f"{server.url}/b.png": None}
+
+	# No requests are made in offline mode.
+	assert len(server.requests) == 1
@@ -0,0 +1,54 @@
+# 3rd party
+import pytest
+
+# this package
+from py2latex.markdown_parser import make_markdown, parse_markdown, tag_handlers
+from py2latex.markdown_parser.cache import ConversionCache
+
+
+def test_maths_in_indented_code():
+	assert parse_markdown("Some $x$ maths.\n\n    plain $x$ code") == (
+			"Some \\(x\\) maths.\n\n\n\\begin{verbatim}\nplain $x$ code\n\\end{verbatim}"
+			)
+
+
+def test_maths_in_highlighted_code():
+	pytest.importorskip("pygments")
+
+	# this package
+	from py2latex.markdown_parser.highlighting import CodeHighlighter
+
+	# The indented code within the list item is not skipped when the maths is replaced,
+	# so the source of the maths must be restored before highlighting.
+	md = make_markdown(code_highlighter=CodeHighlighter())
+	latex = md.convert("* item\n\n        code $x$ here")
+
+	assert '\x02' not in latex
+	assert r"code \PYZdl{}x\PYZdl{} here" in latex
+
+
+@pytest.mark.parametrize("backend", ["markdown", "markdown-it"])
+def test_percent_after_inline_markup(backend: str):
+	if backend == "markdown-it":
+		pytest.importorskip("markdown_it")
+
+	assert parse_markdown("**x**% of it", backend=backend) == "\\textbf{x}\\% of it"
+
+
+@pytest.mark.parametrize("backend", ["markdown", "markdown-it"])
+def test_comment_lines(backend: str):
+	if backend == "markdown-it":
+		pytest.importorskip("markdown_it")
+
+	assert parse_markdown("% A comment\nText with 5% and\n% another", backend=backend) == (
+			"% A comment\nText with 5\\% and\n% another"
+			)
+
+
+def test_cache_tag_handlers(tmp_path, monkeypatch):
+	cache = ConversionCache(tmp_path)
+	assert parse_markdown("Some *emphasis*", cache=cache) == "Some \\emph{emphasis}"
+
+	# The cached LaTeX is not used once a different handler is registered.
+	monkeypatch.setitem(tag_handlers, "em", lambda processor, node, subcontent: f"\\textit{{{subcontent}}}")
+	assert parse_markdown("Some *emphasis*", cache=cache) == "Some \\textit{emphasis}"